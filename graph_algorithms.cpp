@@ -8,6 +8,16 @@
 #include <map>
 #include <stack>
 #include <cmath>
+#include <string>
+#include <thread>
+#include <atomic>
+#include <cstdio>
+#include <chrono>
+#include <cstdint>
+#ifdef _WIN32
+#include <io.h>
+#include <fcntl.h>
+#endif
 
 using namespace std;
 
@@ -45,8 +55,9 @@ struct Edge {
 };
 
 
-vector<int> dijkstra(int start, int end, int n, const vector<vector<pair<int,int>>>& adj, int& dist) {
-    vector<int> d(n, INF), parent(n, -1);
+void shortestPathTree(int start, int n, const vector<vector<pair<int,int>>>& adj, vector<int>& d, vector<int>& parent) {
+    d.assign(n, INF);
+    parent.assign(n, -1);
     priority_queue<pair<int,int>, vector<pair<int,int>>, greater<>> pq;
     
     d[start] = 0;
@@ -64,6 +75,12 @@ vector<int> dijkstra(int start, int end, int n, const vector<vector<pair<int,int
             }
         }
     }
+}
+
+
+vector<int> dijkstra(int start, int end, int n, const vector<vector<pair<int,int>>>& adj, int& dist) {
+    vector<int> d, parent;
+    shortestPathTree(start, n, adj, d, parent);
     
     dist = d[end];
     vector<int> path;
@@ -75,31 +92,370 @@ vector<int> dijkstra(int start, int end, int n, const vector<vector<pair<int,int
 }
 
 
-vector<vector<int>> floydWarshall(int n, const vector<Edge>& edges) {
-    vector<vector<int>> dist(n, vector<int>(n, INF));
+struct SearchBuffers {
+    vector<int> d, parent, touched, wanted;
+    vector<pair<int,int>> heap;
+    
+    SearchBuffers(int n) : d(n, INF), parent(n, -1), wanted(n, -1) {}
+    
+    void reset() {
+        for (int v : touched) {
+            d[v] = INF;
+            parent[v] = -1;
+        }
+        touched.clear();
+        heap.clear();
+    }
+};
+
+
+// Dijkstra from start that stops once every target of this source is settled
+void boundedShortestPaths(int start, const vector<int>& targets, int group, const vector<vector<pair<int,int>>>& adj, SearchBuffers& buf) {
+    buf.reset();
+    int remaining = 0;
+    for (int t : targets) {
+        if (buf.wanted[t] != group) {
+            buf.wanted[t] = group;
+            remaining++;
+        }
+    }
+    
+    buf.d[start] = 0;
+    buf.touched.push_back(start);
+    buf.heap.push_back({0, start});
+    
+    while (!buf.heap.empty() && remaining > 0) {
+        pop_heap(buf.heap.begin(), buf.heap.end(), greater<>());
+        auto [du, u] = buf.heap.back();
+        buf.heap.pop_back();
+        if (du > buf.d[u]) continue;
+        if (buf.wanted[u] == group) {
+            buf.wanted[u] = -1;
+            remaining--;
+        }
+        
+        for (auto [v, w] : adj[u]) {
+            if (du + w < buf.d[v]) {
+                if (buf.d[v] == INF) buf.touched.push_back(v);
+                buf.d[v] = du + w;
+                buf.parent[v] = u;
+                buf.heap.push_back({buf.d[v], v});
+                push_heap(buf.heap.begin(), buf.heap.end(), greater<>());
+            }
+        }
+    }
+    for (int t : targets) buf.wanted[t] = -1;
+}
+
+
+void batchShortestPaths(int n, const vector<vector<pair<int,int>>>& adj, const vector<pair<int,int>>& queries, bool withPaths, vector<int>& dist, vector<vector<int>>& paths) {
+    int q = queries.size();
+    dist.assign(q, INF);
+    if (withPaths) paths.assign(q, {});
+    
+    // Group queries by source so each source is searched once
+    vector<int> sources;
+    vector<vector<int>> bySource(n);
+    for (int i = 0; i < q; i++) {
+        int s = queries[i].first;
+        if (bySource[s].empty()) sources.push_back(s);
+        bySource[s].push_back(i);
+    }
+    
+    int threads = max(1, min((int)thread::hardware_concurrency(), (int)sources.size()));
+    atomic<int> next(0);
+    
+    auto work = [&]() {
+        SearchBuffers buf(n);
+        vector<int> targets;
+        while (true) {
+            int g = next++;
+            if (g >= (int)sources.size()) break;
+            int s = sources[g];
+            
+            targets.clear();
+            for (int i : bySource[s]) targets.push_back(queries[i].second);
+            boundedShortestPaths(s, targets, g, adj, buf);
+            
+            for (int i : bySource[s]) {
+                int t = queries[i].second;
+                dist[i] = buf.d[t];
+                if (withPaths && buf.d[t] != INF) {
+                    for (int v = t; v != -1; v = buf.parent[v]) paths[i].push_back(v);
+                    reverse(paths[i].begin(), paths[i].end());
+                }
+            }
+        }
+    };
+    
+    vector<thread> workers;
+    for (int t = 1; t < threads; t++) workers.emplace_back(work);
+    work();
+    for (auto& w : workers) w.join();
+}
+
+
+struct ScoredPath {
+    int cost;
+    vector<int> nodes;
+    vector<int> prefix;
+    int deviation;
+};
+
+
+// Spur path from spur to end avoiding root nodes and blocked first hops. The
+// unrestricted distances to end are exact when the tree branch is usable and
+// an admissible A* heuristic otherwise.
+bool spurPath(int spur, int end, int rootCost, int bound, const vector<int>& toEnd, const vector<int>& next, const vector<vector<pair<int,int>>>& adj, const vector<int>& rootMark, const vector<int>& blockedMark, int stamp, SearchBuffers& buf, ScoredPath& out) {
+    bool treeUsable = blockedMark[next[spur]] != stamp;
+    for (int v = next[spur]; treeUsable && v != -1; v = next[v]) {
+        if (rootMark[v] == stamp) treeUsable = false;
+    }
+    if (treeUsable) {
+        for (int v = spur; v != -1; v = next[v]) {
+            out.nodes.push_back(v);
+            out.prefix.push_back(rootCost + toEnd[spur] - toEnd[v]);
+        }
+        out.cost = rootCost + toEnd[spur];
+        return true;
+    }
+    
+    buf.reset();
+    buf.d[spur] = 0;
+    buf.touched.push_back(spur);
+    buf.heap.push_back({toEnd[spur], spur});
+    
+    while (!buf.heap.empty()) {
+        pop_heap(buf.heap.begin(), buf.heap.end(), greater<>());
+        auto [fu, u] = buf.heap.back();
+        buf.heap.pop_back();
+        int du = fu - toEnd[u];
+        if (du > buf.d[u]) continue;
+        if (rootCost + fu >= bound) return false;
+        if (u == end) break;
+        
+        for (auto [v, w] : adj[u]) {
+            if (rootMark[v] == stamp || toEnd[v] == INF) continue;
+            if (u == spur && blockedMark[v] == stamp) continue;
+            if (du + w < buf.d[v]) {
+                if (buf.d[v] == INF) buf.touched.push_back(v);
+                buf.d[v] = du + w;
+                buf.parent[v] = u;
+                buf.heap.push_back({buf.d[v] + toEnd[v], v});
+                push_heap(buf.heap.begin(), buf.heap.end(), greater<>());
+            }
+        }
+    }
+    if (buf.d[end] == INF) return false;
     
-    for (int i = 0; i < n; i++) dist[i][i] = 0;
+    vector<int> spurNodes;
+    for (int v = end; v != -1; v = buf.parent[v]) spurNodes.push_back(v);
+    reverse(spurNodes.begin(), spurNodes.end());
+    for (int v : spurNodes) {
+        out.nodes.push_back(v);
+        out.prefix.push_back(rootCost + buf.d[v]);
+    }
+    out.cost = rootCost + buf.d[end];
+    return true;
+}
+
+
+// Yen's k shortest loopless paths with Lawler's deviation rule. One reverse
+// shortest-path tree from end serves every spur search.
+vector<ScoredPath> kShortestPaths(int start, int end, int K, int n, const vector<vector<pair<int,int>>>& adj) {
+    vector<ScoredPath> result;
+    vector<int> toEnd, next;
+    shortestPathTree(end, n, adj, toEnd, next);
+    if (K <= 0 || toEnd[start] == INF) return result;
+    
+    ScoredPath first;
+    first.deviation = 0;
+    first.cost = toEnd[start];
+    for (int v = start; v != -1; v = next[v]) {
+        first.nodes.push_back(v);
+        first.prefix.push_back(toEnd[start] - toEnd[v]);
+    }
+    result.push_back(first);
+    if (start == end) return result;
     
+    auto byCost = [](const ScoredPath& a, const ScoredPath& b) {
+        return a.cost != b.cost ? a.cost < b.cost : a.nodes < b.nodes;
+    };
+    set<ScoredPath, decltype(byCost)> candidates(byCost);
+    set<vector<int>> seen = {first.nodes};
+    
+    SearchBuffers buf(n);
+    vector<int> rootMark(n, -1), blockedMark(n, -1);
+    int stamp = 0;
+    
+    while ((int)result.size() < K) {
+        const ScoredPath& last = result.back();
+        int remaining = K - result.size();
+        
+        for (int i = last.deviation; i + 1 < (int)last.nodes.size(); i++) {
+            // Candidates beyond the number still needed can never be chosen
+            while ((int)candidates.size() > remaining) candidates.erase(prev(candidates.end()));
+            int bound = (int)candidates.size() == remaining ? prev(candidates.end())->cost : INF;
+            
+            int spur = last.nodes[i];
+            int rootCost = last.prefix[i];
+            if (rootCost + toEnd[spur] >= bound) continue;
+            
+            stamp++;
+            for (int j = 0; j < i; j++) rootMark[last.nodes[j]] = stamp;
+            for (const auto& p : result) {
+                if ((int)p.nodes.size() > i + 1 && equal(p.nodes.begin(), p.nodes.begin() + i + 1, last.nodes.begin())) {
+                    blockedMark[p.nodes[i + 1]] = stamp;
+                }
+            }
+            
+            ScoredPath candidate;
+            candidate.deviation = i;
+            candidate.nodes.assign(last.nodes.begin(), last.nodes.begin() + i);
+            candidate.prefix.assign(last.prefix.begin(), last.prefix.begin() + i);
+            if (!spurPath(spur, end, rootCost, bound, toEnd, next, adj, rootMark, blockedMark, stamp, buf, candidate)) continue;
+            if (seen.insert(candidate.nodes).second) candidates.insert(move(candidate));
+        }
+        
+        if (candidates.empty()) break;
+        result.push_back(*candidates.begin());
+        candidates.erase(candidates.begin());
+    }
+    return result;
+}
+
+const int FW_INF = numeric_limits<int>::max() / 2;
+const int FW_BLOCK = 64;
+
+
+template <typename Task>
+void parallelFor(int count, int threads, Task task) {
+    threads = max(1, min(threads, count));
+    atomic<int> next(0);
+    auto work = [&]() {
+        for (int i = next++; i < count; i = next++) task(i);
+    };
+    vector<thread> workers;
+    for (int t = 1; t < threads; t++) workers.emplace_back(work);
+    work();
+    for (auto& w : workers) w.join();
+}
+
+
+// Relax block (ib, jb) of the padded N x N matrix through the pivots of block kb
+void floydWarshallBlock(vector<int>& dist, int N, int ib, int jb, int kb) {
+    int* d = dist.data();
+    for (int k = kb * FW_BLOCK; k < (kb + 1) * FW_BLOCK; k++) {
+        const int* rowK = d + (long long)k * N + jb * FW_BLOCK;
+        for (int i = ib * FW_BLOCK; i < (ib + 1) * FW_BLOCK; i++) {
+            int* rowI = d + (long long)i * N + jb * FW_BLOCK;
+            int dik = d[(long long)i * N + k];
+            for (int j = 0; j < FW_BLOCK; j++) {
+                rowI[j] = min(rowI[j], dik + rowK[j]);
+            }
+        }
+    }
+}
+
+
+// Cache-blocked Floyd-Warshall on a flat row-major matrix padded to a multiple of FW_BLOCK.
+// Unreachable pairs hold FW_INF so the inner loop can add without overflow checks.
+vector<int> tiledFloydWarshall(int n, const vector<Edge>& edges, int& N, int threads) {
+    int blocks = (n + FW_BLOCK - 1) / FW_BLOCK;
+    N = blocks * FW_BLOCK;
+    vector<int> dist((long long)N * N, FW_INF);
+    for (int i = 0; i < N; i++) dist[(long long)i * N + i] = 0;
     for (const auto& e : edges) {
-        dist[e.u][e.v] = min(dist[e.u][e.v], e.weight);
-        dist[e.v][e.u] = min(dist[e.v][e.u], e.weight);
+        long long uv = (long long)e.u * N + e.v, vu = (long long)e.v * N + e.u;
+        dist[uv] = min(dist[uv], e.weight);
+        dist[vu] = min(dist[vu], e.weight);
+    }
+    
+    for (int kb = 0; kb < blocks; kb++) {
+        floydWarshallBlock(dist, N, kb, kb, kb);
+        
+        parallelFor(2 * blocks, threads, [&](int t) {
+            int b = t / 2;
+            if (b == kb) return;
+            if (t % 2 == 0) floydWarshallBlock(dist, N, kb, b, kb);
+            else floydWarshallBlock(dist, N, b, kb, kb);
+        });
+        
+        parallelFor(blocks * blocks, threads, [&](int t) {
+            int ib = t / blocks, jb = t % blocks;
+            if (ib == kb || jb == kb) return;
+            floydWarshallBlock(dist, N, ib, jb, kb);
+        });
     }
+    return dist;
+}
+
+
+vector<vector<int>> floydWarshall(int n, const vector<Edge>& edges) {
+    int N;
+    int threads = max(1u, thread::hardware_concurrency());
+    vector<int> flat = tiledFloydWarshall(n, edges, N, threads);
     
-    for (int k = 0; k < n; k++) {
+    vector<vector<int>> dist(n, vector<int>(n));
+    for (int i = 0; i < n; i++) {
+        for (int j = 0; j < n; j++) {
+            int d = flat[(long long)i * N + j];
+            dist[i][j] = d >= FW_INF ? INF : d;
+        }
+    }
+    return dist;
+}
+
+
+// All-pairs distances as an n x n row-major matrix, -1 where unreachable
+vector<int> allPairsShortestPaths(int n, const vector<Edge>& edges, const vector<vector<pair<int,int>>>& adj, string& strategy) {
+    int threads = max(1u, thread::hardware_concurrency());
+    if (strategy == "auto") {
+        // Repeated Dijkstra costs about n (n + m) log n, tiled Floyd-Warshall n^3
+        double logN = log2((double)n + 2);
+        double dijkstraCost = 8.0 * ((double)n + edges.size()) * logN;
+        strategy = dijkstraCost < (double)n * n ? "dijkstra" : "floyd";
+    }
+    
+    vector<int> result((long long)n * n);
+    if (strategy == "dijkstra") {
+        // Weights are non-negative, so Johnson's reweighting is not needed
+        parallelFor(n, threads, [&](int s) {
+            vector<int> d, parent;
+            shortestPathTree(s, n, adj, d, parent);
+            for (int j = 0; j < n; j++) {
+                result[(long long)s * n + j] = d[j] == INF ? -1 : d[j];
+            }
+        });
+    } else {
+        strategy = "floyd";
+        int N;
+        vector<int> flat = tiledFloydWarshall(n, edges, N, threads);
         for (int i = 0; i < n; i++) {
             for (int j = 0; j < n; j++) {
-                if (dist[i][k] != INF && dist[k][j] != INF) {
-                    dist[i][j] = min(dist[i][j], dist[i][k] + dist[k][j]);
-                }
+                int d = flat[(long long)i * N + j];
+                result[(long long)i * n + j] = d >= FW_INF ? -1 : d;
             }
         }
     }
-    return dist;
+    return result;
 }
 
 
-pair<int, vector<pair<int,int>>> kruskalMST(int n, vector<Edge> edges) {
-    sort(edges.begin(), edges.end());
+struct MinWeight {
+    bool operator()(int a, int b) const { return a < b; }
+};
+
+struct MaxWeight {
+    bool operator()(int a, int b) const { return a > b; }
+};
+
+
+template <typename Better>
+pair<int, vector<pair<int,int>>> kruskalSpanningTree(int n, vector<Edge> edges, Better better) {
+    sort(edges.begin(), edges.end(), [&](const Edge& a, const Edge& b) {
+        return better(a.weight, b.weight);
+    });
     UnionFind uf(n);
     
     int totalWeight = 0;
@@ -117,27 +473,232 @@ pair<int, vector<pair<int,int>>> kruskalMST(int n, vector<Edge> edges) {
 }
 
 
-pair<int, vector<pair<int,int>>> kruskalMaxST(int n, vector<Edge> edges) {
-    sort(edges.begin(), edges.end(), [](const Edge& a, const Edge& b) {
-        return a.weight > b.weight;
-    });
+template <typename Better>
+pair<int, vector<pair<int,int>>> primDense(int n, const vector<vector<pair<int,int>>>& adj, Better better) {
+    vector<int> key(n), via(n, -1);
+    vector<bool> inTree(n, false), hasKey(n, false);
+    
+    int totalWeight = 0;
+    vector<pair<int,int>> mstEdges;
+    
+    for (int added = 0; added < n; added++) {
+        int u = -1;
+        for (int v = 0; v < n; v++) {
+            if (inTree[v] || !hasKey[v]) continue;
+            if (u == -1 || better(key[v], key[u])) u = v;
+        }
+        if (u == -1) {
+            // Nothing reachable from the current tree: start the next component
+            for (int v = 0; v < n; v++) {
+                if (!inTree[v]) { u = v; break; }
+            }
+        } else {
+            totalWeight += key[u];
+            mstEdges.push_back({via[u], u});
+        }
+        
+        inTree[u] = true;
+        for (auto [v, w] : adj[u]) {
+            if (!inTree[v] && (!hasKey[v] || better(w, key[v]))) {
+                key[v] = w;
+                via[v] = u;
+                hasKey[v] = true;
+            }
+        }
+    }
+    
+    return {totalWeight, mstEdges};
+}
+
+
+template <typename Better>
+class IndexedHeap {
+public:
+    IndexedHeap(int n, Better better) : pos(n, -1), key(n), better(better) {}
+    
+    bool empty() const { return heap.empty(); }
+    bool contains(int v) const { return pos[v] != -1; }
+    int keyOf(int v) const { return key[v]; }
+    
+    void push(int v, int k) {
+        key[v] = k;
+        pos[v] = heap.size();
+        heap.push_back(v);
+        siftUp(pos[v]);
+    }
+    
+    void improve(int v, int k) {
+        key[v] = k;
+        siftUp(pos[v]);
+    }
+    
+    int pop() {
+        int top = heap[0];
+        swapAt(0, heap.size() - 1);
+        heap.pop_back();
+        pos[top] = -1;
+        if (!heap.empty()) siftDown(0);
+        return top;
+    }
+
+private:
+    vector<int> heap, pos, key;
+    Better better;
+    
+    void swapAt(int i, int j) {
+        swap(heap[i], heap[j]);
+        pos[heap[i]] = i;
+        pos[heap[j]] = j;
+    }
+    
+    void siftUp(int i) {
+        while (i > 0) {
+            int p = (i - 1) / 2;
+            if (!better(key[heap[i]], key[heap[p]])) break;
+            swapAt(i, p);
+            i = p;
+        }
+    }
+    
+    void siftDown(int i) {
+        int size = heap.size();
+        while (true) {
+            int best = i, l = 2 * i + 1, r = l + 1;
+            if (l < size && better(key[heap[l]], key[heap[best]])) best = l;
+            if (r < size && better(key[heap[r]], key[heap[best]])) best = r;
+            if (best == i) break;
+            swapAt(i, best);
+            i = best;
+        }
+    }
+};
+
+
+template <typename Better>
+pair<int, vector<pair<int,int>>> primHeap(int n, const vector<vector<pair<int,int>>>& adj, Better better) {
+    IndexedHeap<Better> heap(n, better);
+    vector<int> via(n, -1);
+    vector<bool> inTree(n, false);
+    
+    int totalWeight = 0;
+    vector<pair<int,int>> mstEdges;
+    
+    for (int root = 0; root < n; root++) {
+        if (inTree[root]) continue;
+        inTree[root] = true;
+        int u = root;
+        
+        while (true) {
+            for (auto [v, w] : adj[u]) {
+                if (inTree[v]) continue;
+                if (!heap.contains(v)) {
+                    heap.push(v, w);
+                    via[v] = u;
+                } else if (better(w, heap.keyOf(v))) {
+                    heap.improve(v, w);
+                    via[v] = u;
+                }
+            }
+            if (heap.empty()) break;
+            
+            u = heap.pop();
+            inTree[u] = true;
+            totalWeight += heap.keyOf(u);
+            mstEdges.push_back({via[u], u});
+        }
+    }
+    
+    return {totalWeight, mstEdges};
+}
+
+
+template <typename Better>
+pair<int, vector<pair<int,int>>> boruvkaParallel(int n, const vector<Edge>& edges, Better better, int threads) {
+    int m = edges.size();
     UnionFind uf(n);
+    vector<int> comp(n);
+    vector<vector<int>> localBest(threads, vector<int>(n, -1));
+    vector<int> best(n, -1);
+    
+    // Ties are broken by edge index so every round picks a consistent forest
+    auto preferred = [&](int i, int j) {
+        if (j == -1) return true;
+        if (better(edges[i].weight, edges[j].weight)) return true;
+        if (better(edges[j].weight, edges[i].weight)) return false;
+        return i < j;
+    };
     
     int totalWeight = 0;
     vector<pair<int,int>> mstEdges;
     
-    for (const auto& e : edges) {
-        if (uf.unite(e.u, e.v)) {
-            totalWeight += e.weight;
-            mstEdges.push_back({e.u, e.v});
-            if ((int)mstEdges.size() == n - 1) break;
+    while ((int)mstEdges.size() < n - 1) {
+        for (int v = 0; v < n; v++) comp[v] = uf.find(v);
+        
+        vector<thread> workers;
+        for (int t = 0; t < threads; t++) {
+            workers.emplace_back([&, t]() {
+                vector<int>& mine = localBest[t];
+                fill(mine.begin(), mine.end(), -1);
+                int lo = (long long)m * t / threads, hi = (long long)m * (t + 1) / threads;
+                for (int i = lo; i < hi; i++) {
+                    int cu = comp[edges[i].u], cv = comp[edges[i].v];
+                    if (cu == cv) continue;
+                    if (preferred(i, mine[cu])) mine[cu] = i;
+                    if (preferred(i, mine[cv])) mine[cv] = i;
+                }
+            });
+        }
+        for (auto& w : workers) w.join();
+        
+        fill(best.begin(), best.end(), -1);
+        for (int t = 0; t < threads; t++) {
+            for (int c = 0; c < n; c++) {
+                int i = localBest[t][c];
+                if (i != -1 && preferred(i, best[c])) best[c] = i;
+            }
         }
+        
+        bool merged = false;
+        for (int c = 0; c < n; c++) {
+            if (best[c] == -1) continue;
+            const Edge& e = edges[best[c]];
+            if (uf.unite(e.u, e.v)) {
+                totalWeight += e.weight;
+                mstEdges.push_back({e.u, e.v});
+                merged = true;
+            }
+        }
+        if (!merged) break;
     }
     
     return {totalWeight, mstEdges};
 }
 
 
+string chooseSpanningTreeStrategy(int n, int m) {
+    if (n <= 1 || m == 0) return "kruskal";
+    long long pairs = (long long)n * (n - 1) / 2;
+    if (4LL * m >= pairs) return "prim-dense";
+    if (m >= (1 << 20) && thread::hardware_concurrency() > 1) return "boruvka";
+    if (m >= 8LL * n) return "prim";
+    return "kruskal";
+}
+
+
+template <typename Better>
+pair<int, vector<pair<int,int>>> spanningTree(int n, const vector<Edge>& edges, const vector<vector<pair<int,int>>>& adj, Better better, string strategy) {
+    if (strategy == "auto") strategy = chooseSpanningTreeStrategy(n, edges.size());
+    
+    if (strategy == "prim-dense") return primDense(n, adj, better);
+    if (strategy == "prim") return primHeap(n, adj, better);
+    if (strategy == "boruvka") {
+        int threads = max(1u, thread::hardware_concurrency());
+        return boruvkaParallel(n, edges, better, threads);
+    }
+    return kruskalSpanningTree(n, edges, better);
+}
+
+
 vector<int> findOddDegreeVertices(int n, const vector<Edge>& edges) {
     vector<int> degree(n, 0);
     for (const auto& e : edges) {
@@ -155,6 +716,9 @@ vector<int> findOddDegreeVertices(int n, const vector<Edge>& edges) {
 }
 
 
+// Masks below are ints, so 1 << k is only defined for k <= 30
+const int MAX_MATCHING_VERTICES = 30;
+
 int minWeightMatching(const vector<int>& oddVertices, const vector<vector<int>>& dist, vector<pair<int,int>>& matching) {
     int k = oddVertices.size();
     if (k == 0) return 0;
@@ -358,43 +922,8 @@ pair<int, vector<int>> chinesePostman(int n, const vector<Edge>& edges) {
 
 
 
-pair<int, vector<int>> tsp(int n, const vector<vector<int>>& dist, int start) {
-    if (n == 1) return {0, {start}};
-    if (n > 20) {
-        
-        vector<bool> visited(n, false);
-        vector<int> path;
-        int current = start;
-        int totalDist = 0;
-        
-        path.push_back(current);
-        visited[current] = true;
-        
-        for (int i = 1; i < n; i++) {
-            int nearest = -1;
-            int nearestDist = INF;
-            for (int j = 0; j < n; j++) {
-                if (!visited[j] && dist[current][j] < nearestDist) {
-                    nearest = j;
-                    nearestDist = dist[current][j];
-                }
-            }
-            if (nearest == -1) break;
-            
-            visited[nearest] = true;
-            path.push_back(nearest);
-            totalDist += nearestDist;
-            current = nearest;
-        }
-        
-        
-        totalDist += dist[current][start];
-        path.push_back(start);
-        
-        return {totalDist, path};
-    }
-    
-    
+// Exact DP over subsets, O(2^n * n^2) time and O(2^n * n) memory
+pair<int, vector<int>> heldKarp(int n, const vector<vector<int>>& dist, int start) {
     vector<vector<int>> dp(1 << n, vector<int>(n, INF));
     vector<vector<int>> parent(1 << n, vector<int>(n, -1));
     
@@ -451,7 +980,587 @@ pair<int, vector<int>> tsp(int n, const vector<vector<int>>& dist, int start) {
     return {minDist, path};
 }
 
+
+int tourCost(const vector<int>& tour, const vector<vector<int>>& dist) {
+    int cost = 0;
+    for (size_t i = 0; i < tour.size(); i++) cost += dist[tour[i]][tour[(i + 1) % tour.size()]];
+    return cost;
+}
+
+
+vector<int> nearestNeighbourTour(int start, const vector<vector<int>>& dist) {
+    int n = dist.size();
+    vector<bool> visited(n, false);
+    vector<int> tour = {start};
+    visited[start] = true;
+    
+    for (int i = 1; i < n; i++) {
+        int current = tour.back();
+        int nearest = -1;
+        for (int j = 0; j < n; j++) {
+            if (!visited[j] && (nearest == -1 || dist[current][j] < dist[current][nearest])) nearest = j;
+        }
+        visited[nearest] = true;
+        tour.push_back(nearest);
+    }
+    return tour;
+}
+
+
+// 2-opt over each city's nearest neighbours, with don't-look bits
+void twoOpt(vector<int>& tour, const vector<vector<int>>& dist, const vector<vector<int>>& near) {
+    int n = tour.size();
+    vector<int> pos(n);
+    for (int i = 0; i < n; i++) pos[tour[i]] = i;
+    vector<char> active(n, 1);
+    vector<int> queue(tour);
+    
+    auto succ = [&](int v) { return tour[(pos[v] + 1) % n]; };
+    auto pred = [&](int v) { return tour[(pos[v] + n - 1) % n]; };
+    auto apply = [&](int a, int c) {
+        // Replaces (a, succ a) and (c, succ c) with (a, c) and (succ a, succ c)
+        int i = pos[a], j = pos[c];
+        if (i > j) swap(i, j);
+        reverse(tour.begin() + i + 1, tour.begin() + j + 1);
+        for (int k = i + 1; k <= j; k++) pos[tour[k]] = k;
+    };
+    
+    while (!queue.empty()) {
+        int a = queue.back();
+        queue.pop_back();
+        active[a] = 0;
+        
+        bool improved = false;
+        for (int dir = 0; dir < 2 && !improved; dir++) {
+            int an = dir == 0 ? succ(a) : pred(a);
+            for (int c : near[a]) {
+                if (dist[a][c] >= dist[a][an]) break;
+                int cn = dir == 0 ? succ(c) : pred(c);
+                if (c == an || cn == a) continue;
+                int gain = dist[a][an] + dist[c][cn] - dist[a][c] - dist[an][cn];
+                if (gain > 0) {
+                    if (dir == 0) apply(a, c);
+                    else apply(an, cn);
+                    for (int v : {a, an, c, cn}) {
+                        if (!active[v]) {
+                            active[v] = 1;
+                            queue.push_back(v);
+                        }
+                    }
+                    improved = true;
+                    break;
+                }
+            }
+        }
+    }
+}
+
+
+// Moves segments of 1-3 cities to a cheaper place, reversed if that helps
+bool orOpt(vector<int>& tour, const vector<vector<int>>& dist) {
+    int n = tour.size();
+    bool any = false;
+    for (int len = 1; len <= 3 && len < n - 2; len++) {
+        for (int i = 0; i + len <= n; i++) {
+            int p = tour[(i + n - 1) % n], a = tour[i], b = tour[i + len - 1], q = tour[(i + len) % n];
+            int removeGain = dist[p][a] + dist[b][q] - dist[p][q];
+            int bestDelta = 0, bestJ = -1;
+            bool bestReversed = false;
+            for (int j = 0; j < n; j++) {
+                if (j >= i - 1 && j < i + len) continue;
+                int x = tour[j], y = tour[(j + 1) % n];
+                if (y == a) continue;
+                int forward = dist[x][a] + dist[b][y] - dist[x][y] - removeGain;
+                int backward = dist[x][b] + dist[a][y] - dist[x][y] - removeGain;
+                if (forward < bestDelta) bestDelta = forward, bestJ = j, bestReversed = false;
+                if (backward < bestDelta) bestDelta = backward, bestJ = j, bestReversed = true;
+            }
+            if (bestJ == -1) continue;
+            
+            vector<int> segment(tour.begin() + i, tour.begin() + i + len);
+            if (bestReversed) reverse(segment.begin(), segment.end());
+            int after = tour[bestJ];
+            tour.erase(tour.begin() + i, tour.begin() + i + len);
+            int at = find(tour.begin(), tour.end(), after) - tour.begin();
+            tour.insert(tour.begin() + at + 1, segment.begin(), segment.end());
+            any = true;
+        }
+    }
+    return any;
+}
+
+
+vector<vector<int>> neighbourLists(const vector<vector<int>>& dist, int k) {
+    int n = dist.size();
+    k = min(n - 1, k);
+    vector<vector<int>> near(n);
+    for (int v = 0; v < n; v++) {
+        for (int u = 0; u < n; u++) if (u != v) near[v].push_back(u);
+        partial_sort(near[v].begin(), near[v].begin() + k, near[v].end(), [&](int a, int b) { return dist[v][a] < dist[v][b]; });
+        near[v].resize(k);
+    }
+    return near;
+}
+
+
+void localSearch(vector<int>& tour, const vector<vector<int>>& dist, const vector<vector<int>>& near) {
+    twoOpt(tour, dist, near);
+    if (tour.size() <= 500) {
+        while (orOpt(tour, dist)) twoOpt(tour, dist, near);
+    }
+}
+
+
+// Nearest-neighbour starts polished by 2-opt and Or-opt; returns a cyclic order
+vector<int> heuristicTour(const vector<vector<int>>& dist) {
+    int n = dist.size();
+    vector<vector<int>> near = neighbourLists(dist, 10);
+    
+    vector<int> best;
+    int bestCost = INF;
+    int starts = n <= 200 ? n : 8;
+    for (int s = 0; s < starts; s++) {
+        vector<int> tour = nearestNeighbourTour(s * n / starts, dist);
+        localSearch(tour, dist, near);
+        int cost = tourCost(tour, dist);
+        if (cost < bestCost) {
+            bestCost = cost;
+            best = tour;
+        }
+    }
+    return best;
+}
+
+
+// Repairs a tour from before an edit: unknown and repeated nodes are dropped,
+// missing ones go in at their cheapest position, then one local search pass
+vector<int> warmStartTour(const vector<int>& previous, const vector<vector<int>>& dist) {
+    int n = dist.size();
+    vector<bool> present(n, false);
+    vector<int> tour;
+    for (int v : previous) {
+        if (v >= 0 && v < n && !present[v]) {
+            present[v] = true;
+            tour.push_back(v);
+        }
+    }
+    for (int v = 0; v < n; v++) {
+        if (present[v]) continue;
+        int at = 0, bestDelta = INF;
+        for (int i = 0; i < (int)tour.size(); i++) {
+            int a = tour[i], b = tour[(i + 1) % tour.size()];
+            int delta = dist[a][v] + dist[v][b] - (tour.size() > 1 ? dist[a][b] : 0);
+            if (delta < bestDelta) {
+                bestDelta = delta;
+                at = i + 1;
+            }
+        }
+        tour.insert(tour.begin() + at, v);
+    }
+    localSearch(tour, dist, neighbourLists(dist, 10));
+    return tour;
+}
+
+
+// Best-first branch and bound for the symmetric TSP. Each search node is
+// bounded by a Held-Karp 1-tree (a spanning tree on vertices 1..n-1 plus the
+// two cheapest edges at vertex 0) under Lagrangian penalties that push every
+// degree towards 2. Only the frontier is stored: per node the list of fixed
+// edges and the penalties to warm-start its children.
+class TspBranchAndBound {
+public:
+    enum { FREE = 0, INCLUDED = 1, EXCLUDED = 2 };
+    
+    struct SearchNode {
+        int bound;
+        vector<int> fixes;
+        vector<float> pi;
+        bool operator<(const SearchNode& other) const {
+            if (bound != other.bound) return bound > other.bound;
+            return fixes.size() < other.fixes.size();
+        }
+    };
+    
+    TspBranchAndBound(const vector<vector<int>>& dist, double timeLimit)
+        : dist(dist), n(dist.size()), timeLimit(timeLimit), fix(n * n, FREE), included(n) {
+        started = chrono::steady_clock::now();
+    }
+    
+    int upper = INF;
+    int lower = 0;
+    long long expanded = 0;
+    vector<int> best;
+    
+    void seed(const vector<int>& tour) {
+        int cost = tourCost(tour, dist);
+        if (cost < upper) {
+            upper = cost;
+            best = tour;
+        }
+    }
+    
+    // Subgradient ascent on the root only; a lower bound for any tour
+    int rootBound(int iterations) {
+        vector<double> pi(n, 0.0);
+        int bound = ascend(pi, iterations, 2.0);
+        lower = max(lower, min(bound, upper));
+        return bound;
+    }
+    
+    bool solve() {
+        priority_queue<SearchNode> frontier;
+        vector<double> pi(n, 0.0);
+        int root = ascend(pi, max(100, 20 * n), 2.0);
+        lower = max(lower, min(root, upper));
+        report(true);
+        if (root < upper) eliminateEdges(pi);
+        if (root < upper) frontier.push({root, {}, vector<float>(pi.begin(), pi.end())});
+        
+        while (!frontier.empty()) {
+            if (elapsed() > timeLimit) {
+                lower = max(lower, min(frontier.top().bound, upper));
+                return false;
+            }
+            SearchNode node = frontier.top();
+            frontier.pop();
+            lower = max(lower, min(node.bound, upper));
+            report(false);
+            if (node.bound >= upper) continue;
+            expanded++;
+            
+            if (applyFixes(node.fixes)) {
+                pi.assign(node.pi.begin(), node.pi.end());
+                int bound = ascend(pi, max(20, n), 2.0);
+                if (bound < upper) branch(node, bound, pi, frontier);
+            }
+            clearFixes();
+        }
+        lower = upper;
+        return true;
+    }
+    
+    void report(bool force) {
+        double now = elapsed();
+        if (!force && now - lastReport < 0.1) return;
+        lastReport = now;
+        cerr << "BOUND branch-bound " << lower << " " << upper << endl;
+    }
+
+private:
+    const vector<vector<int>>& dist;
+    int n;
+    double timeLimit;
+    double lastReport = 0;
+    chrono::steady_clock::time_point started;
+    vector<char> fix;
+    vector<int> touched;
+    vector<vector<int>> included;
+    vector<int> degree;
+    vector<pair<int,int>> treeEdges;
+    
+    double elapsed() const {
+        return chrono::duration<double>(chrono::steady_clock::now() - started).count();
+    }
+    
+    void setFix(int a, int b, char state) {
+        fix[a * n + b] = fix[b * n + a] = state;
+        touched.push_back(a * n + b);
+        touched.push_back(b * n + a);
+    }
+    
+    void clearFixes() {
+        for (int i : touched) fix[i] = FREE;
+        touched.clear();
+        for (auto& inc : included) inc.clear();
+    }
+    
+    // Applies a node's fixed edges. Vertices with two included edges lose all
+    // their other edges; more than two, or a cycle short of a full tour, is infeasible.
+    bool applyFixes(const vector<int>& fixes) {
+        UnionFind chains(n);
+        int includedCount = 0;
+        bool cycle = false;
+        for (int code : fixes) {
+            int a = code / 2 / n, b = code / 2 % n;
+            if (code % 2) {
+                if (fix[a * n + b] == INCLUDED) continue;
+                setFix(a, b, INCLUDED);
+                included[a].push_back(b);
+                included[b].push_back(a);
+                includedCount++;
+                if (included[a].size() > 2 || included[b].size() > 2) return false;
+                if (!chains.unite(a, b)) cycle = true;
+            } else {
+                setFix(a, b, EXCLUDED);
+            }
+        }
+        if (cycle && includedCount < n) return false;
+        for (int v = 0; v < n; v++) {
+            if (included[v].size() < 2) continue;
+            for (int u = 0; u < n; u++) {
+                if (u != v && fix[v * n + u] == FREE) setFix(v, u, EXCLUDED);
+            }
+        }
+        return true;
+    }
+    
+    // Lagrangian 1-tree value for penalties pi; fills degree and treeEdges
+    double oneTree(const vector<double>& pi) {
+        const double FORCED = 1e12;
+        vector<double> key(n, numeric_limits<double>::infinity());
+        vector<int> from(n, -1);
+        vector<char> inTree(n, 0);
+        degree.assign(n, 0);
+        treeEdges.clear();
+        double total = 0;
+        
+        key[1] = 0;
+        for (int step = 1; step < n; step++) {
+            int u = -1;
+            for (int v = 1; v < n; v++) {
+                if (!inTree[v] && (u == -1 || key[v] < key[u])) u = v;
+            }
+            if (key[u] == numeric_limits<double>::infinity()) return key[u];
+            inTree[u] = 1;
+            if (from[u] != -1) {
+                total += dist[u][from[u]] + pi[u] + pi[from[u]];
+                degree[u]++;
+                degree[from[u]]++;
+                treeEdges.push_back({from[u], u});
+            }
+            for (int v = 1; v < n; v++) {
+                char state = fix[u * n + v];
+                if (inTree[v] || state == EXCLUDED) continue;
+                double c = dist[u][v] + pi[u] + pi[v] - (state == INCLUDED ? FORCED : 0);
+                if (c < key[v]) {
+                    key[v] = c;
+                    from[v] = u;
+                }
+            }
+        }
+        
+        int first = -1, second = -1;
+        double firstCost = 0, secondCost = 0;
+        for (int v = 1; v < n; v++) {
+            char state = fix[v];
+            if (state == EXCLUDED) continue;
+            double c = dist[0][v] + pi[0] + pi[v] - (state == INCLUDED ? FORCED : 0);
+            if (first == -1 || c < firstCost) {
+                second = first;
+                secondCost = firstCost;
+                first = v;
+                firstCost = c;
+            } else if (second == -1 || c < secondCost) {
+                second = v;
+                secondCost = c;
+            }
+        }
+        if (second == -1) return numeric_limits<double>::infinity();
+        for (int v : {first, second}) {
+            total += dist[0][v] + pi[0] + pi[v];
+            degree[0]++;
+            degree[v]++;
+            treeEdges.push_back({0, v});
+        }
+        
+        for (int v = 0; v < n; v++) total -= 2 * pi[v];
+        return total;
+    }
+    
+    // Subgradient ascent from pi; leaves the best penalties in pi and the
+    // matching tree in degree/treeEdges. Returns the integer lower bound.
+    int ascend(vector<double>& pi, int iterations, double lambda) {
+        double bestValue = -numeric_limits<double>::infinity();
+        vector<double> bestPi = pi;
+        int stall = 0;
+        
+        for (int it = 0; it < iterations; it++) {
+            double value = oneTree(pi);
+            if (value == numeric_limits<double>::infinity()) return INF;
+            
+            int norm = 0;
+            for (int v = 0; v < n; v++) norm += (degree[v] - 2) * (degree[v] - 2);
+            if (norm == 0) {
+                recordTour();
+                return (int)ceil(value - 1e-6);
+            }
+            
+            if (value > bestValue + 1e-9) {
+                bestValue = value;
+                bestPi = pi;
+                stall = 0;
+            } else if (++stall >= max(5, n / 8)) {
+                lambda /= 2;
+                stall = 0;
+            }
+            if (ceil(bestValue - 1e-6) >= upper || lambda < 1e-4) break;
+            
+            double target = upper == INF ? bestValue * 1.05 + 1 : upper;
+            double step = lambda * (target - value) / norm;
+            for (int v = 0; v < n; v++) pi[v] += step * (degree[v] - 2);
+        }
+        pi = bestPi;
+        oneTree(pi);
+        return (int)ceil(bestValue - 1e-6);
+    }
+    
+    // Permanently drops edges whose forced 1-tree already reaches the upper
+    // bound: swapping one in costs at least its price minus the heaviest tree
+    // edge it would replace. Dropped edges are never recorded in touched.
+    void eliminateEdges(const vector<double>& pi) {
+        double value = oneTree(pi);
+        vector<vector<pair<int,double>>> tree(n);
+        double zeroWorst = -numeric_limits<double>::infinity();
+        for (auto [a, b] : treeEdges) {
+            double c = dist[a][b] + pi[a] + pi[b];
+            if (a == 0) {
+                zeroWorst = max(zeroWorst, c);
+                continue;
+            }
+            tree[a].push_back({b, c});
+            tree[b].push_back({a, c});
+        }
+        
+        vector<double> heaviest(n);
+        vector<int> stack;
+        for (int s = 1; s < n; s++) {
+            fill(heaviest.begin(), heaviest.end(), numeric_limits<double>::quiet_NaN());
+            heaviest[s] = -numeric_limits<double>::infinity();
+            stack.assign(1, s);
+            while (!stack.empty()) {
+                int u = stack.back();
+                stack.pop_back();
+                for (auto [v, c] : tree[u]) {
+                    if (heaviest[v] == heaviest[v]) continue;
+                    heaviest[v] = max(heaviest[u], c);
+                    stack.push_back(v);
+                }
+            }
+            for (int v = s + 1; v < n; v++) {
+                double gain = dist[s][v] + pi[s] + pi[v] - heaviest[v];
+                if (ceil(value + gain - 1e-6) >= upper) fix[s * n + v] = fix[v * n + s] = EXCLUDED;
+            }
+            double gain = dist[0][s] + pi[0] + pi[s] - zeroWorst;
+            if (ceil(value + gain - 1e-6) >= upper) fix[s] = fix[s * n] = EXCLUDED;
+        }
+    }
+    
+    // A 1-tree where every degree is 2 is a tour
+    void recordTour() {
+        vector<vector<int>> nbr(n);
+        for (auto [a, b] : treeEdges) {
+            nbr[a].push_back(b);
+            nbr[b].push_back(a);
+        }
+        vector<int> tour = {0};
+        int prev = -1, cur = 0;
+        while ((int)tour.size() < n) {
+            int next = nbr[cur][0] == prev ? nbr[cur][1] : nbr[cur][0];
+            prev = cur;
+            cur = next;
+            tour.push_back(cur);
+        }
+        int before = upper;
+        seed(tour);
+        if (upper < before) report(true);
+    }
+    
+    void branch(const SearchNode& node, int bound, const vector<double>& pi, priority_queue<SearchNode>& frontier) {
+        int v = max_element(degree.begin(), degree.end()) - degree.begin();
+        vector<int> freeEdges;
+        for (auto [a, b] : treeEdges) {
+            int u = a == v ? b : (b == v ? a : -1);
+            if (u != -1 && fix[v * n + u] == FREE) freeEdges.push_back(u);
+        }
+        if (freeEdges.size() < 2) return;
+        // Branching on the costliest edges raises the children's bounds the most
+        sort(freeEdges.begin(), freeEdges.end(), [&](int a, int b) { return dist[v][a] + pi[a] > dist[v][b] + pi[b]; });
+        
+        auto code = [&](int a, int b, bool in) { return (min(a, b) * n + max(a, b)) * 2 + (in ? 1 : 0); };
+        int e1 = freeEdges[0], e2 = freeEdges[1];
+        vector<vector<int>> children = {{code(v, e1, false)}};
+        if (included[v].empty()) {
+            children.push_back({code(v, e1, true), code(v, e2, false)});
+            children.push_back({code(v, e1, true), code(v, e2, true)});
+        } else {
+            children.push_back({code(v, e1, true)});
+        }
+        
+        vector<float> warm(pi.begin(), pi.end());
+        for (auto& extra : children) {
+            SearchNode child{max(bound, node.bound), node.fixes, warm};
+            child.fixes.insert(child.fixes.end(), extra.begin(), extra.end());
+            frontier.push(move(child));
+        }
+    }
+};
+
+
+// Estimated work of each exact solver; Held-Karp is also limited by its memory
+string chooseTspSolver(int n) {
+    if (n <= 3) return "held-karp";
+    double heldKarp = n <= 20 ? pow(2.0, n) * n * n : numeric_limits<double>::infinity();
+    double branchBound = 50.0 * n * n * n * pow(1.08, n);
+    if (heldKarp <= branchBound) return "held-karp";
+    if (n <= 120) return "branch-bound";
+    return "heuristic";
+}
+
+
+// Tour over the shortest-path metric; lowerBound receives a proven bound
+pair<int, vector<int>> tsp(int n, const vector<vector<int>>& dist, int start, string& solver, double timeLimit, const vector<int>& warm, int& lowerBound) {
+    if (n == 1) {
+        lowerBound = 0;
+        return {0, {start}};
+    }
+    for (int u = 0; u < n; u++) {
+        for (int v = 0; v < n; v++) {
+            if (dist[u][v] == INF) return {-1, {}};
+        }
+    }
+    if (solver == "auto") solver = chooseTspSolver(n);
+    if (solver == "held-karp" && n > 20) solver = "branch-bound";
+    
+    if (solver == "held-karp") {
+        auto result = heldKarp(n, dist, start);
+        lowerBound = result.first;
+        return result;
+    }
+    
+    TspBranchAndBound search(dist, timeLimit);
+    search.seed(warm.empty() ? heuristicTour(dist) : warmStartTour(warm, dist));
+    if (solver == "branch-bound") search.solve();
+    else search.rootBound(min(500, max(30, 200000000 / (n * n))));
+    lowerBound = search.lower;
+    
+    vector<int> tour = search.best;
+    rotate(tour.begin(), find(tour.begin(), tour.end(), start), tour.end());
+    tour.push_back(start);
+    return {search.upper, tour};
+}
+
+
+// Edges are text triples, or m raw native int32 (u, v, w) records after a "binary" tag
+void readEdges(vector<Edge>& edges) {
+    while (cin.peek() == ' ') cin.get();
+    if (cin.peek() != 'b') {
+        for (Edge& e : edges) cin >> e.u >> e.v >> e.weight;
+        return;
+    }
+    string tag;
+    cin >> tag;
+    cin.get();
+    vector<int32_t> raw(3 * edges.size());
+    cin.read(reinterpret_cast<char*>(raw.data()), raw.size() * sizeof(int32_t));
+    for (size_t i = 0; i < edges.size(); i++) {
+        edges[i] = {raw[3 * i], raw[3 * i + 1], raw[3 * i + 2]};
+    }
+}
+
 int main() {
+#ifdef _WIN32
+    _setmode(_fileno(stdin), _O_BINARY);
+#endif
     string mode;
     cin >> mode;
     
@@ -460,9 +1569,9 @@ int main() {
     
     vector<Edge> edges(m);
     vector<vector<pair<int,int>>> adj(n);
+    readEdges(edges);
     
     for (int i = 0; i < m; i++) {
-        cin >> edges[i].u >> edges[i].v >> edges[i].weight;
         adj[edges[i].u].push_back({edges[i].v, edges[i].weight});
         adj[edges[i].v].push_back({edges[i].u, edges[i].weight});
     }
@@ -484,8 +1593,94 @@ int main() {
             cout << endl;
         }
     }
+    else if (mode == "spt") {
+        int start;
+        cin >> start;
+        
+        vector<int> d, parent;
+        shortestPathTree(start, n, adj, d, parent);
+        
+        for (int i = 0; i < n; i++) {
+            cout << (d[i] == INF ? -1 : d[i]);
+            if (i < n - 1) cout << " ";
+        }
+        cout << endl;
+        for (int i = 0; i < n; i++) {
+            cout << parent[i];
+            if (i < n - 1) cout << " ";
+        }
+        cout << endl;
+    }
+    else if (mode == "dijkstra-batch") {
+        int q, withPaths = 0;
+        cin >> q >> withPaths;
+        
+        vector<pair<int,int>> queries(q);
+        for (auto& [s, t] : queries) cin >> s >> t;
+        
+        vector<int> dist;
+        vector<vector<int>> paths;
+        batchShortestPaths(n, adj, queries, withPaths != 0, dist, paths);
+        
+        string out;
+        for (int i = 0; i < q; i++) {
+            out += to_string(dist[i] == INF ? -1 : dist[i]);
+            if (withPaths) {
+                for (int v : paths[i]) {
+                    out += ' ';
+                    out += to_string(v);
+                }
+            }
+            out += '\n';
+        }
+        cout << out;
+    }
+    else if (mode == "ksp") {
+        int start, end, k;
+        cin >> start >> end >> k;
+        
+        vector<ScoredPath> paths = kShortestPaths(start, end, k, n, adj);
+        
+        if (paths.empty()) {
+            cout << "NO_PATH" << endl;
+        } else {
+            string out;
+            for (const auto& p : paths) {
+                out += to_string(p.cost);
+                for (int v : p.nodes) {
+                    out += ' ';
+                    out += to_string(v);
+                }
+                out += '\n';
+            }
+            cout << out;
+        }
+    }
+    else if (mode == "apsp") {
+        // The path has a line of its own so it may contain spaces
+        string path, strategy;
+        cin >> ws;
+        getline(cin, path);
+        if (!path.empty() && path.back() == '\r') path.pop_back();
+        if (!(cin >> strategy)) strategy = "auto";
+        
+        vector<int> dist = allPairsShortestPaths(n, edges, adj, strategy);
+        
+        FILE* out = fopen(path.c_str(), "wb");
+        if (!out) {
+            cout << "ERROR cannot write " << path << endl;
+            return 1;
+        }
+        fwrite(dist.data(), sizeof(int), dist.size(), out);
+        fclose(out);
+        
+        cout << n << " " << strategy << endl;
+    }
     else if (mode == "mst") {
-        auto [weight, mstEdges] = kruskalMST(n, edges);
+        string strategy;
+        if (!(cin >> strategy)) strategy = "auto";
+        
+        auto [weight, mstEdges] = spanningTree(n, edges, adj, MinWeight(), strategy);
         
         cout << weight << endl;
         for (auto& e : mstEdges) {
@@ -493,7 +1688,10 @@ int main() {
         }
     }
     else if (mode == "maxst") {
-        auto [weight, mstEdges] = kruskalMaxST(n, edges);
+        string strategy;
+        if (!(cin >> strategy)) strategy = "auto";
+        
+        auto [weight, mstEdges] = spanningTree(n, edges, adj, MaxWeight(), strategy);
         
         cout << weight << endl;
         for (auto& e : mstEdges) {
@@ -501,6 +1699,10 @@ int main() {
         }
     }
     else if (mode == "chinese") {
+        if ((int)findOddDegreeVertices(n, edges).size() > MAX_MATCHING_VERTICES) {
+            cout << "ERROR too many odd-degree vertices" << endl;
+            return 1;
+        }
         auto [cost, circuit] = chinesePostman(n, edges);
         
         cout << cost << endl;
@@ -513,10 +1715,20 @@ int main() {
     }
     else if (mode == "tsp") {
         int start;
+        string solver;
+        double timeLimit;
         cin >> start;
+        if (!(cin >> solver)) solver = "auto";
+        if (!(cin >> timeLimit)) timeLimit = 10;
+        int warmCount = 0;
+        if (!(cin >> warmCount)) warmCount = 0;
+        vector<int> warm(warmCount);
+        for (int& v : warm) cin >> v;
         
         auto dist = floydWarshall(n, edges);
-        auto [cost, path] = tsp(n, dist, start);
+        int lowerBound = 0;
+        auto [cost, path] = tsp(n, dist, start, solver, timeLimit, warm, lowerBound);
+        if (cost != -1) cerr << "BOUND " << solver << " " << lowerBound << " " << cost << endl;
         
         if (cost == -1) {
             cout << "NO_PATH" << endl;
@@ -1,12 +1,1071 @@
 #!/usr/bin/env python3
 
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
+from tkinter import ttk, messagebox, simpledialog, filedialog
 import subprocess
 import os
 import sys
 import platform
 import math
+import heapq
+import threading
+import time
+import mmap
+import tempfile
+import json
+import weakref
+from collections import deque
+from collections.abc import Mapping
+from itertools import accumulate, compress
+from array import array
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:
+    Image = None
+
+
+INF = float("inf")
+SPANNING_TREE_SOLVERS = ("auto", "kruskal", "prim", "prim-dense", "boruvka")
+
+
+class SpanningTreeState:
+    def __init__(self, n, maximize=False):
+        self.maximize = maximize
+        self.tree = [{} for _ in range(n)]
+        self.total = 0
+
+    def better(self, a, b):
+        return a > b if self.maximize else a < b
+
+    def contains(self, u, v):
+        return v in self.tree[u]
+
+    def link(self, u, v, w):
+        self.tree[u][v] = w
+        self.tree[v][u] = w
+        self.total += w
+
+    def cut(self, u, v):
+        w = self.tree[u].pop(v)
+        del self.tree[v][u]
+        self.total -= w
+
+    def edges(self):
+        result = [
+            (u, v, w)
+            for u, nbrs in enumerate(self.tree)
+            for v, w in nbrs.items()
+            if u < v
+        ]
+        result.sort(key=lambda e: e[2], reverse=self.maximize)
+        return [(u, v) for u, v, _ in result]
+
+    def tree_path(self, u, v):
+        parent = {u: None}
+        stack = [u]
+        while stack and v not in parent:
+            x = stack.pop()
+            for y in self.tree[x]:
+                if y not in parent:
+                    parent[y] = x
+                    stack.append(y)
+        if v not in parent:
+            return None
+        path = [v]
+        while parent[path[-1]] is not None:
+            path.append(parent[path[-1]])
+        return path
+
+    def component(self, u):
+        seen = {u}
+        stack = [u]
+        while stack:
+            x = stack.pop()
+            for y in self.tree[x]:
+                if y not in seen:
+                    seen.add(y)
+                    stack.append(y)
+        return seen
+
+    def reconnect(self, u, adjacency):
+        # Cheapest (or heaviest) edge leaving the component of u rejoins the forest
+        side = self.component(u)
+        best = None
+        for a in side:
+            for b, w in adjacency[a].items():
+                if b not in side and (best is None or self.better(w, best[2])):
+                    best = (a, b, w)
+        if best is not None:
+            self.link(*best)
+
+    def insert_edge(self, u, v, w):
+        path = self.tree_path(u, v)
+        if path is None:
+            self.link(u, v, w)
+            return
+        worst = None
+        for a, b in zip(path, path[1:]):
+            if worst is None or self.better(worst[2], self.tree[a][b]):
+                worst = (a, b, self.tree[a][b])
+        if self.better(w, worst[2]):
+            self.cut(worst[0], worst[1])
+            self.link(u, v, w)
+
+    def remove_edge(self, u, v, adjacency):
+        if self.contains(u, v):
+            self.cut(u, v)
+            self.reconnect(u, adjacency)
+
+    def reweight_edge(self, u, v, w, adjacency):
+        if not self.contains(u, v):
+            self.insert_edge(u, v, w)
+            return
+        old = self.tree[u][v]
+        if self.better(old, w):
+            self.cut(u, v)
+            self.reconnect(u, adjacency)
+        else:
+            self.tree[u][v] = w
+            self.tree[v][u] = w
+            self.total += w - old
+
+    def add_node(self):
+        self.tree.append({})
+
+    def remove_node(self, k):
+        self.tree.pop(k)
+        self.tree = [
+            {(v - 1 if v > k else v): w for v, w in nbrs.items()} for nbrs in self.tree
+        ]
+
+
+class ShortestPathTreeState:
+    def __init__(self, source, dist, parent):
+        self.source = source
+        self.dist = dist
+        self.parent = parent
+
+    def path_to(self, end):
+        if end is None or self.dist[end] == INF:
+            return None
+        path = [end]
+        while self.parent[path[-1]] != -1:
+            path.append(self.parent[path[-1]])
+        path.reverse()
+        return path
+
+    def settle(self, heap, adjacency):
+        dist, parent = self.dist, self.parent
+        heapq.heapify(heap)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for v, w in adjacency[u].items():
+                if d + w < dist[v]:
+                    dist[v] = d + w
+                    parent[v] = u
+                    heapq.heappush(heap, (dist[v], v))
+
+    def decrease_edge(self, u, v, w, adjacency):
+        heap = []
+        for a, b in ((u, v), (v, u)):
+            if self.dist[a] + w < self.dist[b]:
+                self.dist[b] = self.dist[a] + w
+                self.parent[b] = a
+                heap.append((self.dist[b], b))
+        self.settle(heap, adjacency)
+
+    def increase_edge(self, u, v, adjacency):
+        if self.parent[v] == u:
+            child = v
+        elif self.parent[u] == v:
+            child = u
+        else:
+            return
+
+        children = {}
+        for x, p in enumerate(self.parent):
+            if p != -1:
+                children.setdefault(p, []).append(x)
+        subtree = {child}
+        stack = [child]
+        while stack:
+            for y in children.get(stack.pop(), ()):
+                subtree.add(y)
+                stack.append(y)
+
+        for x in subtree:
+            self.dist[x] = INF
+            self.parent[x] = -1
+        heap = []
+        for x in subtree:
+            for y, w in adjacency[x].items():
+                if y not in subtree and self.dist[y] + w < self.dist[x]:
+                    self.dist[x] = self.dist[y] + w
+                    self.parent[x] = y
+            if self.dist[x] != INF:
+                heap.append((self.dist[x], x))
+        self.settle(heap, adjacency)
+
+    def add_node(self):
+        self.dist.append(INF)
+        self.parent.append(-1)
+
+    def remove_node(self, k):
+        self.dist.pop(k)
+        self.parent.pop(k)
+        self.parent = [p - 1 if p > k else p for p in self.parent]
+        if self.source > k:
+            self.source -= 1
+
+
+class TourStore:
+    def __init__(self, version, tour, cost, lower, solver):
+        # The cycle is kept without its closing node so any start is a rotation
+        self.version = version
+        self.cycle = list(tour[:-1]) if len(tour) > 1 else list(tour)
+        self.cost = cost
+        self.lower = lower
+        self.solver = solver
+
+    def rotated(self, start):
+        i = self.cycle.index(start)
+        tour = self.cycle[i:] + self.cycle[:i]
+        return tour + [start] if len(tour) > 1 else tour
+
+    def remove_node(self, k):
+        self.cycle = [v - 1 if v > k else v for v in self.cycle if v != k]
+
+    def remap(self, remap):
+        self.cycle = [remap[v] for v in self.cycle if remap[v] >= 0]
+
+
+class GraphAnalysis:
+    OPS_PER_SECOND = 2e8
+    MAX_MATCHING_VERTICES = 30  # mirrors the backend's int bitmask matching
+
+    def __init__(self, adjacency):
+        n = len(adjacency)
+        degrees = [len(nbrs) for nbrs in adjacency]
+        self.n = n
+        self.m = sum(degrees) // 2
+
+        self.component = [-1] * n
+        self.components = 0
+        self.edge_components = 0
+        for s in range(n):
+            if self.component[s] != -1:
+                continue
+            self.component[s] = self.components
+            has_edges = False
+            stack = [s]
+            while stack:
+                u = stack.pop()
+                for v in adjacency[u]:
+                    has_edges = True
+                    if self.component[v] == -1:
+                        self.component[v] = self.components
+                        stack.append(v)
+            self.components += 1
+            if has_edges:
+                self.edge_components += 1
+
+        self.min_degree = min(degrees, default=0)
+        self.max_degree = max(degrees, default=0)
+        self.mean_degree = 2 * self.m / n if n else 0
+        self.odd_vertices = sum(d % 2 for d in degrees)
+        self.density = 2 * self.m / (n * (n - 1)) if n > 1 else 0
+
+        self.tsp_solver = self.choose_tsp_solver()
+        self.estimates = {}
+
+    def estimate(self, mode):
+        # Only the requested mode is estimated; results are cached with the analysis
+        if mode not in self.estimates:
+            estimators = {
+                "spt": self.shortest_path_cost,
+                "mst": self.spanning_tree_cost,
+                "chinese": self.chinese_postman_cost,
+                "tsp": self.traveling_salesman_cost,
+            }
+            self.estimates[mode] = estimators[mode]()
+        return self.estimates[mode]
+
+    def cost(self, ops, memory):
+        return ops / self.OPS_PER_SECOND, memory
+
+    def shortest_path_cost(self):
+        n, m = self.n, self.m
+        return self.cost((n + m) * math.log2(n + 2), 16 * (n + m))
+
+    def spanning_tree_cost(self):
+        return self.cost(self.m * math.log2(self.m + 2), 16 * self.m)
+
+    def chinese_postman_cost(self):
+        n, k = self.n, self.odd_vertices
+        if k > self.MAX_MATCHING_VERTICES:
+            return INF, INF
+        if k == 0:
+            return self.cost(self.m * math.log2(self.m + 2), 48 * self.m)
+        return self.cost(n**3 + 2**k * k, 4 * n * n + 8 * 2**k + 48 * self.m)
+
+    def choose_tsp_solver(self):
+        # Mirrors chooseTspSolver in the backend
+        n = self.n
+        if n <= 3 or (n <= 20 and 2**n * n * n <= 50 * n**3 * 1.08**n):
+            return "Held-Karp"
+        if n <= 120:
+            return "branch-and-bound"
+        return "heuristic"
+
+    def traveling_salesman_cost(self):
+        # Branch and bound stops at the backend's time limit with the best tour
+        # so far, so only its root bound computation is counted
+        n = self.n
+        if self.tsp_solver == "Held-Karp":
+            return self.cost(n**3 + 2**n * n * n, 4 * n * n + 2 * 2**n * (4 * n + 24))
+        if self.tsp_solver == "branch-and-bound":
+            return self.cost(21 * n**3, 5 * n * n + 10000 * (4 * n + 64))
+        return self.cost(n**3 + 500 * n * n, 5 * n * n)
+
+    def connected(self, u, v):
+        return self.component[u] == self.component[v]
+
+
+EDGE_COLOR = "#888888"
+CURRENT_EDGE_COLOR = "#FF0000"
+NODE_COLORS = {
+    "current": ("#FF5500", "#CC3300"),
+    "start": ("#00CC00", "#008800"),
+    "end": ("#CC0000", "#880000"),
+    "path": ("#FFAA00", "#CC8800"),
+    "selected": ("#00AAFF", "#0088CC"),
+    "regular": ("#4488FF", "#2266CC"),
+}
+
+
+def edge_key(u, v):
+    return (u, v) if u < v else (v, u)
+
+
+def point_in_polygon(x, y, polygon):
+    inside = False
+    x1, y1 = polygon[-1]
+    for x2, y2 in polygon:
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def edge_style(key, highlighted, current_edge, highlight_color, zoom):
+    if key == current_edge:
+        return CURRENT_EDGE_COLOR, max(3, int(6 * zoom))
+    if key in highlighted:
+        return highlight_color, max(2, int(4 * zoom))
+    return EDGE_COLOR, max(1, int(2 * zoom))
+
+
+def node_style(i, current_nodes, start_node, end_node, path_nodes, selected_nodes):
+    if i in current_nodes:
+        return NODE_COLORS["current"]
+    if i == start_node:
+        return NODE_COLORS["start"]
+    if i == end_node:
+        return NODE_COLORS["end"]
+    if i in path_nodes:
+        return NODE_COLORS["path"]
+    if i in selected_nodes:
+        return NODE_COLORS["selected"]
+    return NODE_COLORS["regular"]
+
+
+class GraphExporter:
+    SVG_BATCH = 4096
+    MAX_PNG_PIXELS = 40_000_000  # about 120 MB as an RGB image
+    MAX_PNG_SIDE = 16384
+
+    def __init__(
+        self,
+        nodes,
+        edges,
+        start_node=None,
+        end_node=None,
+        highlighted_path=(),
+        highlighted_edges=(),
+        highlight_color="#00AA00",
+        scale=1.0,
+        node_radius=25,
+        weight_labels=True,
+        margin=20,
+        max_pixels=None,
+        max_side=None,
+    ):
+        self.nodes = nodes
+        self.edges = edges
+        self.start_node = start_node
+        self.end_node = end_node
+        self.path_nodes = set(highlighted_path)
+        self.highlighted = {edge_key(u, v) for u, v in highlighted_edges}
+        self.highlight_color = highlight_color
+
+        xs = [x for x, _ in nodes] or [0]
+        ys = [y for _, y in nodes] or [0]
+        self.min_x, self.min_y = min(xs), min(ys)
+        span_x, span_y = max(xs) - self.min_x, max(ys) - self.min_y
+
+        # Shrink the scale until the image fits the pixel caps
+        while True:
+            pad = margin + node_radius * scale
+            width = int(span_x * scale + 2 * pad) + 1
+            height = int(span_y * scale + 2 * pad) + 1
+            shrink = 1.0
+            if max_pixels and width * height > max_pixels:
+                shrink = math.sqrt(max_pixels / (width * height))
+            if max_side and max(width, height) > max_side:
+                shrink = min(shrink, max_side / max(width, height))
+            if shrink >= 1.0:
+                break
+            scale *= shrink * 0.99
+
+        self.width, self.height, self.pad = width, height, pad
+        self.scale = scale
+        self.radius = node_radius * scale
+        self.weight_labels = weight_labels
+        self.font_size = max(8, int(12 * scale))
+        self.weight_font_size = max(7, int(9 * scale))
+        self.label_size = max(8, 12 * scale)
+
+    def point(self, i):
+        x, y = self.nodes[i]
+        return (
+            (x - self.min_x) * self.scale + self.pad,
+            (y - self.min_y) * self.scale + self.pad,
+        )
+
+    def edge_groups(self):
+        # Highlighted edges are drawn last so they stay on top of regular ones
+        groups = {}
+        for u, v, w in self.edges:
+            style = edge_style(
+                edge_key(u, v), self.highlighted, None, self.highlight_color, self.scale
+            )
+            groups.setdefault(style, []).append((u, v, w))
+        return sorted(groups.items(), key=lambda item: item[0][1])
+
+    def node_colors(self, i):
+        return node_style(i, (), self.start_node, self.end_node, self.path_nodes, ())
+
+    def write_svg(self, filename):
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(
+                '<svg xmlns="http://www.w3.org/2000/svg" '
+                f'width="{self.width}" height="{self.height}" '
+                f'viewBox="0 0 {self.width} {self.height}">\n'
+                f'<rect width="100%" height="100%" fill="white"/>\n'
+            )
+
+            groups = self.edge_groups()
+            for (color, width), edges in groups:
+                for start in range(0, len(edges), self.SVG_BATCH):
+                    segments = []
+                    for u, v, _ in edges[start : start + self.SVG_BATCH]:
+                        x1, y1 = self.point(u)
+                        x2, y2 = self.point(v)
+                        segments.append(f"M{x1:.1f} {y1:.1f}L{x2:.1f} {y2:.1f}")
+                    f.write(
+                        f'<path fill="none" stroke="{color}" stroke-width="{width}" '
+                        f'stroke-linecap="round" d="{"".join(segments)}"/>\n'
+                    )
+
+            if self.weight_labels:
+                rx, ry = self.label_size, self.label_size * 0.8
+                for (color, _), edges in groups:
+                    f.write(
+                        f'<g fill="white" stroke="{color}" font-family="Arial" '
+                        f'font-weight="bold" font-size="{self.weight_font_size}" '
+                        'text-anchor="middle" dominant-baseline="central">\n'
+                    )
+                    for start in range(0, len(edges), self.SVG_BATCH):
+                        chunk = []
+                        for u, v, w in edges[start : start + self.SVG_BATCH]:
+                            x1, y1 = self.point(u)
+                            x2, y2 = self.point(v)
+                            mx, my = (x1 + x2) / 2, (y1 + y2) / 2
+                            chunk.append(
+                                f'<ellipse cx="{mx:.1f}" cy="{my:.1f}" '
+                                f'rx="{rx:.1f}" ry="{ry:.1f}"/>'
+                                f'<text x="{mx:.1f}" y="{my:.1f}" fill="{color}" '
+                                f'stroke="none">{w}</text>\n'
+                            )
+                        f.write("".join(chunk))
+                    f.write("</g>\n")
+
+            outline_width = max(2, int(3 * self.scale))
+            f.write(
+                f'<g stroke-width="{outline_width}" font-family="Arial" '
+                f'font-weight="bold" font-size="{self.font_size}" '
+                'text-anchor="middle" dominant-baseline="central">\n'
+            )
+            chunk = []
+            for i in range(len(self.nodes)):
+                x, y = self.point(i)
+                color, outline = self.node_colors(i)
+                chunk.append(
+                    f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{self.radius:.1f}" '
+                    f'fill="{color}" stroke="{outline}"/>'
+                    f'<text x="{x:.1f}" y="{y:.1f}" fill="white" '
+                    f'stroke="none">{i}</text>\n'
+                )
+                if len(chunk) >= self.SVG_BATCH:
+                    f.write("".join(chunk))
+                    chunk = []
+            f.write("".join(chunk))
+            f.write("</g>\n</svg>\n")
+
+    def load_font(self, size):
+        try:
+            return ImageFont.load_default(size)
+        except TypeError:
+            return ImageFont.load_default()
+
+    def stroke(self, draw, u, v, color, width):
+        # Parallel 1px lines are far cheaper in Pillow than its polygon-based wide lines
+        x1, y1 = self.point(u)
+        x2, y2 = self.point(v)
+        steep = abs(y2 - y1) > abs(x2 - x1)
+        for k in range(width):
+            o = k - (width - 1) / 2
+            if steep:
+                draw.line([(x1 + o, y1), (x2 + o, y2)], fill=color)
+            else:
+                draw.line([(x1, y1 + o), (x2, y2 + o)], fill=color)
+
+    def label_sprite(self, text, color, font, cache):
+        key = (text, color)
+        if key not in cache:
+            rx, ry = self.label_size, self.label_size * 0.8
+            w, h = int(2 * rx) + 2, int(2 * ry) + 2
+            sprite = Image.new("RGBA", (w, h), (0, 0, 0, 0))
+            draw = ImageDraw.Draw(sprite)
+            draw.ellipse([0, 0, w - 1, h - 1], fill="white", outline=color)
+            draw.text((w / 2, h / 2), text, fill=color, font=font, anchor="mm")
+            cache[key] = sprite
+        return cache[key]
+
+    def write_png(self, filename):
+        if Image is None:
+            raise RuntimeError("PNG export requires Pillow (pip install pillow).")
+
+        image = Image.new("RGB", (self.width, self.height), "white")
+        draw = ImageDraw.Draw(image)
+        weight_font = self.load_font(self.weight_font_size)
+        node_font = self.load_font(self.font_size)
+
+        groups = self.edge_groups()
+        for (color, width), edges in groups:
+            for u, v, _ in edges:
+                self.stroke(draw, u, v, color, width)
+
+        if self.weight_labels:
+            sprites = {}
+            for (color, _), edges in groups:
+                for u, v, w in edges:
+                    sprite = self.label_sprite(str(w), color, weight_font, sprites)
+                    x1, y1 = self.point(u)
+                    x2, y2 = self.point(v)
+                    mx, my = (x1 + x2) / 2, (y1 + y2) / 2
+                    box = (int(mx - sprite.width / 2), int(my - sprite.height / 2))
+                    image.paste(sprite, box, sprite)
+
+        r = self.radius
+        outline_width = max(2, int(3 * self.scale))
+        for i in range(len(self.nodes)):
+            x, y = self.point(i)
+            color, outline = self.node_colors(i)
+            draw.ellipse(
+                [x - r, y - r, x + r, y + r],
+                fill=color,
+                outline=outline,
+                width=outline_width,
+            )
+            draw.text((x, y), str(i), fill="white", font=node_font, anchor="mm")
+
+        image.save(filename)
+
+
+def export_graph(filename, nodes, edges, **options):
+    # Returns the scale actually used, which PNG export lowers to fit its caps
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".svg":
+        exporter = GraphExporter(nodes, edges, **options)
+        exporter.write_svg(filename)
+    elif extension == ".png":
+        options.setdefault("max_pixels", GraphExporter.MAX_PNG_PIXELS)
+        options.setdefault("max_side", GraphExporter.MAX_PNG_SIDE)
+        exporter = GraphExporter(nodes, edges, **options)
+        exporter.write_png(filename)
+    else:
+        raise ValueError(f"Unsupported image format: {extension or filename}")
+    return exporter.scale
+
+
+class IntStreamParser:
+    def __init__(self):
+        self.values = array("i")
+        self.text = None
+        self.pending = b""
+
+    def feed(self, chunk):
+        # Only whole tokens are parsed; a number split across chunks waits for the rest
+        data = self.pending + chunk
+        cut = max(data.rfind(b" "), data.rfind(b"\n"))
+        if cut == -1:
+            self.pending = data
+            return
+        self.pending = data[cut + 1 :]
+        self.parse(data[:cut])
+
+    def close(self):
+        self.parse(self.pending)
+        self.pending = b""
+
+    def parse(self, data):
+        try:
+            self.values.extend(map(int, data.split()))
+        except ValueError:
+            self.text = data.decode().strip()
+
+
+class DistanceMatrix:
+    def __init__(self, filename, n, strategy="", temporary=False):
+        self.filename = filename
+        self.n = n
+        self.strategy = strategy
+        self.buffer = None
+        self.closed = False
+        if n > 0:
+            with open(filename, "rb") as f:
+                self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            self.values = memoryview(self.buffer).cast("i")
+        else:
+            self.values = memoryview(array("i"))
+        # A temporary file goes away on close(), when the matrix is garbage
+        # collected, or at interpreter exit, whichever comes first. The
+        # finalizer holds the mapping so it can unmap before removing the file.
+        self.remover = None
+        if temporary:
+            self.remover = weakref.finalize(
+                self, DistanceMatrix.discard, self.values, self.buffer, filename
+            )
+
+    def distance(self, u, v):
+        d = self.values[u * self.n + v]
+        return None if d < 0 else d
+
+    def row(self, u):
+        # A copy, so no view into the mapping outlives close()
+        return array("i", self.values[u * self.n : (u + 1) * self.n].tobytes())
+
+    def close(self):
+        self.closed = True
+        if self.remover is not None:
+            self.remover()
+        else:
+            DistanceMatrix.release(self.values, self.buffer)
+        self.buffer = None
+
+    @staticmethod
+    def release(values, buffer):
+        try:
+            values.release()
+            if buffer is not None:
+                buffer.close()
+        except BufferError:
+            # Someone still holds a view; the mapping goes when that view does
+            pass
+
+    @staticmethod
+    def discard(values, buffer, filename):
+        try:
+            DistanceMatrix.release(values, buffer)
+        finally:
+            DistanceMatrix.remove(filename)
+
+    @staticmethod
+    def remove(filename):
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+
+
+class RenderStats:
+    def __init__(self, window=1000):
+        self.window = window
+        self.redraw_times = deque(maxlen=window)
+        self.latencies = deque(maxlen=window)
+        self.events = {}
+        self.pending_event = None
+        self.redraws = 0
+        self.previews = 0
+        self.ticks = 0
+        self.dropped_ticks = 0
+        self.item_count = 0
+
+    def record_event(self, kind):
+        now = time.perf_counter()
+        self.events.setdefault(kind, deque(maxlen=self.window)).append(now)
+        if self.pending_event is None:
+            self.pending_event = now
+
+    def record_redraw(self, started, item_count):
+        now = time.perf_counter()
+        self.redraws += 1
+        self.redraw_times.append(now - started)
+        self.item_count = item_count
+        if self.pending_event is not None:
+            self.latencies.append(now - self.pending_event)
+            self.pending_event = None
+
+    def record_preview(self):
+        self.previews += 1
+        if self.pending_event is not None:
+            self.latencies.append(time.perf_counter() - self.pending_event)
+            self.pending_event = None
+
+    def record_tick(self, lateness, period):
+        self.ticks += 1
+        if period > 0 and lateness > period:
+            self.dropped_ticks += int(lateness // period)
+
+    def events_per_second(self, kind):
+        now = time.perf_counter()
+        return sum(1 for t in self.events.get(kind, ()) if now - t <= 1.0)
+
+    @staticmethod
+    def percentile(samples, q):
+        if not samples:
+            return 0.0
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def snapshot(self):
+        ms = 1000.0
+        return {
+            "redraws": self.redraws,
+            "previews": self.previews,
+            "redraw_ms": {
+                f"p{int(q * 100)}": self.percentile(self.redraw_times, q) * ms
+                for q in (0.5, 0.9, 0.99)
+            },
+            "redraw_max_ms": max(self.redraw_times, default=0.0) * ms,
+            "latency_ms": {
+                f"p{int(q * 100)}": self.percentile(self.latencies, q) * ms
+                for q in (0.5, 0.9, 0.99)
+            },
+            "items": self.item_count,
+            "ticks": self.ticks,
+            "dropped_ticks": self.dropped_ticks,
+            "events_per_second": {
+                kind: self.events_per_second(kind) for kind in self.events
+            },
+        }
+
+    def export(self, filename):
+        data = self.snapshot()
+        data["redraw_samples_ms"] = [t * 1000.0 for t in self.redraw_times]
+        data["latency_samples_ms"] = [t * 1000.0 for t in self.latencies]
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2)
+
+
+class SpatialGrid:
+    def __init__(self, cell):
+        self.cell = cell
+        self.cells = {}
+
+    def key(self, x, y):
+        return int(math.floor(x / self.cell)), int(math.floor(y / self.cell))
+
+    def insert(self, i, x, y):
+        self.cells.setdefault(self.key(x, y), set()).add(i)
+
+    def remove(self, i, x, y):
+        k = self.key(x, y)
+        bucket = self.cells.get(k)
+        if bucket is not None:
+            bucket.discard(i)
+            if not bucket:
+                del self.cells[k]
+
+    def move(self, i, old, new):
+        if self.key(*old) != self.key(*new):
+            self.remove(i, *old)
+            self.insert(i, *new)
+
+    def rebuild(self, points):
+        self.cells = {}
+        for i, (x, y) in enumerate(points):
+            self.insert(i, x, y)
+
+    def near(self, x, y):
+        cx, cy = self.key(x, y)
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                yield from self.cells.get((gx, gy), ())
+
+
+class NodeStore:
+    # Coordinates kept as two float columns; rows are read back as (x, y) tuples
+    def __init__(self, points=()):
+        self.x = array("d")
+        self.y = array("d")
+        for x, y in points:
+            self.append((x, y))
+
+    def __len__(self):
+        return len(self.x)
+
+    def __iter__(self):
+        return zip(self.x, self.y)
+
+    def __getitem__(self, i):
+        return self.x[i], self.y[i]
+
+    def __setitem__(self, i, point):
+        self.x[i], self.y[i] = point
+
+    def append(self, point):
+        self.x.append(point[0])
+        self.y.append(point[1])
+
+    def pop(self, i):
+        point = self[i]
+        del self.x[i]
+        del self.y[i]
+        return point
+
+    def copy(self):
+        store = NodeStore()
+        store.x, store.y = self.x[:], self.y[:]
+        return store
+
+    def compact(self, remap):
+        keep = bytearray(r >= 0 for r in remap)
+        self.x = array("d", compress(self.x, keep))
+        self.y = array("d", compress(self.y, keep))
+
+    def nbytes(self):
+        return (len(self.x) + len(self.y)) * self.x.itemsize
+
+
+class EdgeStore:
+    # Edges kept as int columns u, v, w; rows are read back as (u, v, w) tuples
+    def __init__(self, edges=()):
+        self.u = array("i")
+        self.v = array("i")
+        self.w = array("i")
+        for u, v, w in edges:
+            self.append(u, v, w)
+
+    def __len__(self):
+        return len(self.u)
+
+    def __iter__(self):
+        return zip(self.u, self.v, self.w)
+
+    def __getitem__(self, i):
+        return self.u[i], self.v[i], self.w[i]
+
+    def append(self, u, v, w):
+        self.u.append(u)
+        self.v.append(v)
+        self.w.append(w)
+
+    def swap_remove(self, i):
+        # Moves the last edge into row i; returns its endpoints if it moved
+        last = len(self.u) - 1
+        moved = None
+        if i != last:
+            self.u[i], self.v[i], self.w[i] = self.u[last], self.v[last], self.w[last]
+            moved = (self.u[i], self.v[i])
+        self.u.pop()
+        self.v.pop()
+        self.w.pop()
+        return moved
+
+    def copy(self):
+        store = EdgeStore()
+        store.u, store.v, store.w = self.u[:], self.v[:], self.w[:]
+        return store
+
+    def compact(self, remap):
+        # Drops edges touching removed nodes (remap -1) and renumbers the rest
+        keep = bytearray(
+            remap[a] >= 0 and remap[b] >= 0 for a, b in zip(self.u, self.v)
+        )
+        self.u = array("i", map(remap.__getitem__, compress(self.u, keep)))
+        self.v = array("i", map(remap.__getitem__, compress(self.v, keep)))
+        self.w = array("i", compress(self.w, keep))
+
+    def to_bytes(self):
+        rows = array("i", bytes(3 * self.u.itemsize * len(self.u)))
+        rows[0::3] = self.u
+        rows[1::3] = self.v
+        rows[2::3] = self.w
+        return rows.tobytes()
+
+    def nbytes(self):
+        return 3 * len(self.u) * self.u.itemsize
+
+
+class Adjacency:
+    # Compressed rows (offsets, neighbours, edge ids) over an EdgeStore; weights
+    # are read from the store by edge id. Rows edited since the last rebuild are
+    # kept as small {neighbour: edge id} dicts in `edited`.
+    def __init__(self, edges, n=0):
+        self.edges = edges
+        self.rebuild(n)
+
+    def rebuild(self, n):
+        offsets = array("i", bytes(4 * (n + 1)))
+        for u in self.edges.u:
+            offsets[u + 1] += 1
+        for v in self.edges.v:
+            offsets[v + 1] += 1
+        self.offsets = array("i", accumulate(offsets))
+        fill = self.offsets[:-1]
+        self.neighbours = array("i", bytes(4 * self.offsets[-1]))
+        self.edge_ids = array("i", bytes(4 * self.offsets[-1]))
+        for i, (u, v) in enumerate(zip(self.edges.u, self.edges.v)):
+            self.neighbours[fill[u]] = v
+            self.edge_ids[fill[u]] = i
+            fill[u] += 1
+            self.neighbours[fill[v]] = u
+            self.edge_ids[fill[v]] = i
+            fill[v] += 1
+        self.edited = {}
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, u):
+        return AdjacencyRow(self, u)
+
+    def __iter__(self):
+        return (AdjacencyRow(self, u) for u in range(len(self)))
+
+    def ids(self, u):
+        row = self.edited.get(u)
+        if row is not None:
+            return row.items()
+        lo, hi = self.offsets[u], self.offsets[u + 1]
+        return zip(self.neighbours[lo:hi], self.edge_ids[lo:hi])
+
+    def degree(self, u):
+        row = self.edited.get(u)
+        if row is not None:
+            return len(row)
+        return self.offsets[u + 1] - self.offsets[u]
+
+    def edge_id(self, u, v):
+        row = self.edited.get(u)
+        if row is not None:
+            return row.get(v, -1)
+        try:
+            i = self.neighbours.index(v, self.offsets[u], self.offsets[u + 1])
+        except ValueError:
+            return -1
+        return self.edge_ids[i]
+
+    def editable(self, u):
+        if u not in self.edited:
+            self.edited[u] = dict(self.ids(u))
+        return self.edited[u]
+
+    def add_node(self):
+        self.offsets.append(self.offsets[-1])
+
+    def link(self, u, v, i):
+        self.editable(u)[v] = i
+        self.editable(v)[u] = i
+
+    def unlink(self, u, v):
+        del self.editable(u)[v]
+        del self.editable(v)[u]
+
+    def relabel(self, u, v, i):
+        for a, b in ((u, v), (v, u)):
+            if a in self.edited:
+                self.edited[a][b] = i
+            else:
+                j = self.neighbours.index(b, self.offsets[a], self.offsets[a + 1])
+                self.edge_ids[j] = i
+
+    def nbytes(self):
+        return (
+            len(self.offsets) + len(self.neighbours) + len(self.edge_ids)
+        ) * self.offsets.itemsize
+
+
+class AdjacencyRow(Mapping):
+    # Read-only {neighbour: weight} view of one Adjacency row
+    __slots__ = ("adjacency", "u")
+
+    def __init__(self, adjacency, u):
+        self.adjacency = adjacency
+        self.u = u
+
+    def __getitem__(self, v):
+        i = self.adjacency.edge_id(self.u, v)
+        if i < 0:
+            raise KeyError(v)
+        return self.adjacency.edges.w[i]
+
+    def __iter__(self):
+        return (v for v, _ in self.adjacency.ids(self.u))
+
+    def __len__(self):
+        return self.adjacency.degree(self.u)
+
+    def items(self):
+        weights = self.adjacency.edges.w
+        return [(v, weights[i]) for v, i in self.adjacency.ids(self.u)]
+
+
+class PairArray:
+    # (u, v) pairs packed into one flat int array instead of a list of tuples
+    def __init__(self, pairs=()):
+        self.data = array("i")
+        for pair in pairs:
+            self.data.extend(pair)
+
+    @classmethod
+    def from_flat(cls, data):
+        pairs = cls()
+        pairs.data = data
+        return pairs
+
+    def __len__(self):
+        return len(self.data) // 2
+
+    def __iter__(self):
+        values = iter(self.data)
+        return zip(values, values)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, _ = i.indices(len(self))
+            return PairArray.from_flat(self.data[2 * start : 2 * stop])
+        if i < 0:
+            i += len(self)
+        return self.data[2 * i], self.data[2 * i + 1]
+
+    def nodes(self):
+        return list(dict.fromkeys(self.data))
 
 
 class GraphApp:
@@ -15,10 +1074,17 @@ class GraphApp:
         self.root.title("Graph Algorithms Visualizer")
         self.root.geometry("1200x800")
 
-        self.nodes = []
-        self.edges = []
+        self.nodes = NodeStore()
+        self.edges = EdgeStore()
+        self.adjacency = Adjacency(self.edges)
+        self.graph_version = 0
+        self.analysis = None
         self.node_radius = 25
+        self.node_grid = SpatialGrid(self.node_radius)
+        self.node_items = []
+        self.edge_items = {}
         self.selected_node = None
+        self.selected_nodes = set()
         self.start_node = None
         self.end_node = None
         self.mode = "add_node"
@@ -51,6 +1117,57 @@ class GraphApp:
         self.pan_start_x = 0
         self.pan_start_y = 0
         self.is_panning = False
+        self.drag_node = None
+        self.drag_offset = (0, 0)
+        self.drag_target = None
+        self.drag_job = None
+        self.drag_interval = 16  # milliseconds, about one display refresh
+        self.view_job = None
+        self.view_settle_job = None
+        self.view_settle_delay = 150  # milliseconds without input before a full redraw
+        self.drawn_view = (0, 0, 1.0)
+        self.view_preview = False
+        self.band_points = []
+        self.band_lasso = False
+        self.band_item = None
+        self.export_scale = 2.0
+        self.export_worker = None
+        self.render_stats = RenderStats()
+        self.show_hud = False
+        self.animation_due = 0.0
+
+        self.mst_state = None
+        self.maxst_state = None
+        self.spt_state = None
+        self.apsp = None
+        self.shown_result = None
+        self.k_paths = 3
+        self.path_alternatives = []
+        self.alternative_index = 0
+
+        self.last_algorithm = None
+        self.auto_run = False
+        self.auto_run_delay = 300  # milliseconds
+        self.auto_run_job = None
+        self.backend_process = None
+        self.backend_generation = 0
+        self.backend_timeout = 10  # seconds
+        self.max_backend_memory = 2 * 1024**3  # bytes
+        self.stream_poll_interval = 50  # milliseconds
+        self.stream_redraw_interval = 0.25  # seconds between progress redraws
+        self.result_step_limit = 500
+        self.spanning_tree_solver = "auto"
+        self.tsp_solver = "auto"  # auto, held-karp, branch-bound, heuristic
+        self.tsp_bound = None
+        self.tour_store = None
+        self.algorithm_commands = {
+            "dijkstra": self.find_shortest_path,
+            "ksp": self.k_shortest_paths,
+            "mst": self.find_mst,
+            "maxst": self.find_max_st,
+            "chinese": self.chinese_postman,
+            "tsp": self.traveling_salesman,
+        }
 
         self.setup_ui()
         self.compile_cpp()
@@ -71,6 +1188,8 @@ class GraphApp:
             ("Add Edge", "add_edge"),
             ("Set Start", "select_start"),
             ("Set End", "select_end"),
+            ("Move Node", "move_node"),
+            ("Select", "select"),
         ]
         for text, value in modes:
             ttk.Radiobutton(
@@ -80,6 +1199,27 @@ class GraphApp:
                 value=value,
                 command=self.change_mode,
             ).pack(anchor=tk.W)
+        self.drag_reweight_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            mode_frame,
+            text="Recompute weights on move",
+            variable=self.drag_reweight_var,
+        ).pack(anchor=tk.W)
+
+        selection_frame = ttk.LabelFrame(left_panel, text="Selection", padding="5")
+        selection_frame.pack(fill=tk.X, pady=5)
+        selection_actions = [
+            ("Delete", self.delete_selection),
+            ("Set Weight", self.reweight_selection),
+            ("As Start", self.selection_as_start),
+            ("As End", self.selection_as_end),
+        ]
+        for index, (text, command) in enumerate(selection_actions):
+            ttk.Button(selection_frame, text=text, command=command).grid(
+                row=index // 2, column=index % 2, sticky="ew", padx=1, pady=1
+            )
+        selection_frame.columnconfigure(0, weight=1)
+        selection_frame.columnconfigure(1, weight=1)
 
         algo_frame = ttk.LabelFrame(left_panel, text="Algorithms", padding="5")
         algo_frame.pack(fill=tk.X, pady=10)
@@ -87,6 +1227,9 @@ class GraphApp:
         ttk.Button(
             algo_frame, text="Dijkstra Shortest Path", command=self.find_shortest_path
         ).pack(fill=tk.X, pady=2)
+        ttk.Button(
+            algo_frame, text="K Shortest Paths", command=self.k_shortest_paths
+        ).pack(fill=tk.X, pady=2)
         ttk.Separator(algo_frame, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=5)
 
         ttk.Button(
@@ -96,6 +1239,20 @@ class GraphApp:
             algo_frame, text="Maximum Spanning Tree", command=self.find_max_st
         ).pack(fill=tk.X, pady=2)
 
+        solver_row = ttk.Frame(algo_frame)
+        solver_row.pack(fill=tk.X, pady=2)
+        ttk.Label(solver_row, text="Solver:").pack(side=tk.LEFT)
+        self.spanning_tree_solver_var = tk.StringVar(value=self.spanning_tree_solver)
+        solver_box = ttk.Combobox(
+            solver_row,
+            textvariable=self.spanning_tree_solver_var,
+            values=SPANNING_TREE_SOLVERS,
+            state="readonly",
+            width=12,
+        )
+        solver_box.pack(side=tk.LEFT, padx=5)
+        solver_box.bind("<<ComboboxSelected>>", self.change_spanning_tree_solver)
+
         ttk.Separator(algo_frame, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=5)
 
         ttk.Button(
@@ -105,6 +1262,16 @@ class GraphApp:
             algo_frame, text="Traveling Salesman", command=self.traveling_salesman
         ).pack(fill=tk.X, pady=2)
 
+        ttk.Separator(algo_frame, orient=tk.HORIZONTAL).pack(fill=tk.X, pady=5)
+
+        self.auto_run_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            algo_frame,
+            text="Auto-run on edit",
+            variable=self.auto_run_var,
+            command=self.toggle_auto_run,
+        ).pack(anchor=tk.W)
+
         action_frame = ttk.LabelFrame(left_panel, text="Actions", padding="5")
         action_frame.pack(fill=tk.X, pady=10)
 
@@ -120,6 +1287,9 @@ class GraphApp:
         ttk.Button(action_frame, text="Reset View", command=self.reset_view).pack(
             fill=tk.X, pady=2
         )
+        ttk.Button(action_frame, text="Export Image", command=self.export_image).pack(
+            fill=tk.X, pady=2
+        )
 
         info_frame = ttk.LabelFrame(left_panel, text="Graph Info", padding="5")
         info_frame.pack(fill=tk.X, pady=10)
@@ -173,6 +1343,16 @@ class GraphApp:
         zoom_frame.pack(fill=tk.X, pady=10)
         self.zoom_var = tk.StringVar(value="Zoom: 100%")
         ttk.Label(zoom_frame, textvariable=self.zoom_var).pack(anchor=tk.W)
+        self.hud_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            zoom_frame,
+            text="Performance HUD",
+            variable=self.hud_var,
+            command=self.toggle_hud,
+        ).pack(anchor=tk.W)
+        ttk.Button(zoom_frame, text="Export Stats", command=self.export_stats).pack(
+            fill=tk.X, pady=2
+        )
         result_frame = ttk.LabelFrame(right_panel, text="Result", padding="5")
         result_frame.pack(fill=tk.BOTH, expand=True, pady=5)
         result_scroll = ttk.Scrollbar(result_frame)
@@ -231,6 +1411,17 @@ class GraphApp:
         ttk.Button(
             btn_frame, text="⏹ Stop", width=10, command=self.stop_animation
         ).pack(side=tk.LEFT, padx=5)
+        self.alternative_row = ttk.Frame(anim_container)
+        ttk.Button(
+            self.alternative_row, text="◀ Alt", width=8, command=self.alternative_prev
+        ).pack(side=tk.LEFT, padx=5)
+        self.alternative_var = tk.StringVar(value="")
+        ttk.Label(self.alternative_row, textvariable=self.alternative_var).pack(
+            side=tk.LEFT, padx=5
+        )
+        ttk.Button(
+            self.alternative_row, text="Alt ▶", width=8, command=self.alternative_next
+        ).pack(side=tk.LEFT, padx=5)
         speed_frame = ttk.Frame(anim_container)
         speed_frame.pack(pady=2)
         ttk.Label(speed_frame, text="Speed:").pack(side=tk.LEFT)
@@ -249,6 +1440,8 @@ class GraphApp:
         self.speed_label.pack(side=tk.LEFT)
 
         self.canvas.bind("<Button-1>", self.on_left_click)
+        self.canvas.bind("<B1-Motion>", self.on_drag_move)
+        self.canvas.bind("<ButtonRelease-1>", self.on_drag_end)
         self.canvas.bind("<Button-3>", self.on_right_click)
         self.canvas.bind("<Button-2>", self.on_pan_start)
         self.canvas.bind("<B2-Motion>", self.on_pan_move)
@@ -256,15 +1449,19 @@ class GraphApp:
         self.canvas.bind("<MouseWheel>", self.on_zoom)
         self.canvas.bind("<Button-4>", self.on_zoom)
         self.canvas.bind("<Button-5>", self.on_zoom)
+        self.canvas.bind("<Delete>", lambda event: self.delete_selection())
 
     def change_mode(self):
         self.mode = self.mode_var.get()
         self.selected_node = None
+        self.selected_nodes = set()
         messages = {
             "add_node": "Click to add a node",
             "add_edge": "Click first node, then second to add edge",
             "select_start": "Click a node to set as START",
             "select_end": "Click a node to set as END",
+            "move_node": "Drag a node to move it",
+            "select": "Drag a rectangle (Shift: lasso) to select nodes",
         }
         self.status_var.set(messages.get(self.mode, ""))
         self.redraw()
@@ -277,13 +1474,14 @@ class GraphApp:
 
     def on_pan_move(self, event):
         if self.is_panning:
+            self.render_stats.record_event("pan")
             dx = event.x - self.pan_start_x
             dy = event.y - self.pan_start_y
             self.canvas_offset_x += dx
             self.canvas_offset_y += dy
             self.pan_start_x = event.x
             self.pan_start_y = event.y
-            self.redraw()
+            self.schedule_view_frame()
 
     def on_pan_end(self, event):
         self.is_panning = False
@@ -303,13 +1501,13 @@ class GraphApp:
         new_zoom = self.zoom_level * scale_factor
         if new_zoom < 0.2 or new_zoom > 5.0:
             return
+        self.render_stats.record_event("zoom")
 
         self.canvas_offset_x = mouse_x - (mouse_x - self.canvas_offset_x) * scale_factor
         self.canvas_offset_y = mouse_y - (mouse_y - self.canvas_offset_y) * scale_factor
 
         self.zoom_level = new_zoom
-        self.zoom_var.set(f"Zoom: {int(self.zoom_level * 100)}%")
-        self.redraw()
+        self.schedule_view_frame()
 
     def reset_view(self):
         self.canvas_offset_x = 0
@@ -318,6 +1516,40 @@ class GraphApp:
         self.zoom_var.set("Zoom: 100%")
         self.redraw()
 
+    def schedule_view_frame(self):
+        if self.view_job is None:
+            self.view_job = self.root.after(self.drag_interval, self.apply_view_frame)
+        if self.view_settle_job is not None:
+            self.root.after_cancel(self.view_settle_job)
+        self.view_settle_job = self.root.after(self.view_settle_delay, self.settle_view)
+
+    def apply_view_frame(self):
+        self.view_job = None
+        self.zoom_var.set(f"Zoom: {int(self.zoom_level * 100)}%")
+        times = self.render_stats.redraw_times
+        if times and times[-1] * 1000 < self.drag_interval / 2:
+            self.redraw()
+            return
+        ox, oy, zoom = self.drawn_view
+        factor = self.zoom_level / zoom
+        if factor != 1.0:
+            self.canvas.scale("graph", ox, oy, factor, factor)
+        self.canvas.move("graph", self.canvas_offset_x - ox, self.canvas_offset_y - oy)
+        self.drawn_view = (self.canvas_offset_x, self.canvas_offset_y, self.zoom_level)
+        self.view_preview = True
+        self.render_stats.record_preview()
+        if self.show_hud:
+            self.canvas.delete("hud")
+            self.draw_hud()
+
+    def settle_view(self):
+        self.view_settle_job = None
+        if self.view_job is not None:
+            self.root.after_cancel(self.view_job)
+            self.view_job = None
+        if self.view_preview:
+            self.redraw()
+
     def screen_to_world(self, sx, sy):
         wx = (sx - self.canvas_offset_x) / self.zoom_level
         wy = (sy - self.canvas_offset_y) / self.zoom_level
@@ -339,7 +1571,15 @@ class GraphApp:
 
         try:
             result = subprocess.run(
-                ["g++", "-O3", "-std=c++17", "-o", self.exe_path, self.cpp_path],
+                [
+                    "g++",
+                    "-O3",
+                    "-std=c++17",
+                    "-pthread",
+                    "-o",
+                    self.exe_path,
+                    self.cpp_path,
+                ],
                 capture_output=True,
                 text=True,
             )
@@ -363,11 +1603,167 @@ class GraphApp:
 
     def get_node_at(self, x, y):
         wx, wy = self.screen_to_world(x, y)
-        for i, (nx, ny) in enumerate(self.nodes):
-            if math.sqrt((wx - nx) ** 2 + (wy - ny) ** 2) <= self.node_radius:
-                return i
+        hits = [
+            i
+            for i in self.node_grid.near(wx, wy)
+            if math.hypot(wx - self.nodes[i][0], wy - self.nodes[i][1])
+            <= self.node_radius
+        ]
+        return min(hits, default=None)
+
+    def get_edge_at(self, x, y):
+        oval_size = max(8, 12 * self.zoom_level)
+        for n1, n2, _ in self.edges:
+            x1, y1 = self.world_to_screen(*self.nodes[n1])
+            x2, y2 = self.world_to_screen(*self.nodes[n2])
+            mx, my = (x1 + x2) / 2, (y1 + y2) / 2
+            if abs(x - mx) <= oval_size and abs(y - my) <= oval_size * 0.8:
+                return n1, n2
         return None
 
+    def rebuild_adjacency(self):
+        self.graph_version += 1
+        self.adjacency = Adjacency(self.edges, len(self.nodes))
+        self.node_grid.rebuild(self.nodes)
+
+    def reset_results(self):
+        self.mst_state = None
+        self.maxst_state = None
+        self.spt_state = None
+
+    def tree_states(self):
+        return [s for s in (self.mst_state, self.maxst_state) if s is not None]
+
+    def add_node(self, wx, wy):
+        self.graph_version += 1
+        self.nodes.append((wx, wy))
+        self.adjacency.add_node()
+        self.node_grid.insert(len(self.nodes) - 1, wx, wy)
+        for state in self.tree_states():
+            state.add_node()
+        if self.spt_state:
+            self.spt_state.add_node()
+
+    def add_edge(self, u, v, w):
+        self.graph_version += 1
+        self.adjacency.link(u, v, len(self.edges))
+        self.edges.append(u, v, w)
+        for state in self.tree_states():
+            state.insert_edge(u, v, w)
+        if self.spt_state:
+            self.spt_state.decrease_edge(u, v, w, self.adjacency)
+
+    def remove_edge(self, u, v):
+        self.graph_version += 1
+        i = self.adjacency.edge_id(u, v)
+        self.adjacency.unlink(u, v)
+        moved = self.edges.swap_remove(i)
+        if moved is not None:
+            self.adjacency.relabel(*moved, i)
+        for state in self.tree_states():
+            state.remove_edge(u, v, self.adjacency)
+        if self.spt_state:
+            self.spt_state.increase_edge(u, v, self.adjacency)
+
+    def set_edge_weight(self, u, v, w):
+        self.set_edge_weights({edge_key(u, v): w})
+
+    def set_edge_weights(self, weights):
+        self.graph_version += 1
+        for (u, v), w in weights.items():
+            i = self.adjacency.edge_id(u, v)
+            old = self.edges.w[i]
+            self.edges.w[i] = w
+            for state in self.tree_states():
+                state.reweight_edge(u, v, w, self.adjacency)
+            if self.spt_state:
+                if w < old:
+                    self.spt_state.decrease_edge(u, v, w, self.adjacency)
+                else:
+                    self.spt_state.increase_edge(u, v, self.adjacency)
+
+    def delete_node(self, k):
+        self.graph_version += 1
+        incident = list(self.adjacency[k])
+        for v in incident:
+            self.adjacency.unlink(k, v)
+        for v in incident:
+            for state in self.tree_states():
+                state.remove_edge(k, v, self.adjacency)
+            if self.spt_state:
+                self.spt_state.increase_edge(k, v, self.adjacency)
+
+        n = len(self.nodes)
+        self.edges.compact(list(range(k)) + [-1] + list(range(k, n - 1)))
+        self.nodes.pop(k)
+        self.node_grid.rebuild(self.nodes)
+        self.selected_nodes = set()
+        self.adjacency.rebuild(len(self.nodes))
+        for state in self.tree_states():
+            state.remove_node(k)
+        if self.tour_store:
+            self.tour_store.remove_node(k)
+        if self.spt_state:
+            if self.spt_state.source == k:
+                self.spt_state = None
+            else:
+                self.spt_state.remove_node(k)
+
+    def delete_nodes(self, removed):
+        # One compaction pass over nodes and edges; incremental results are dropped
+        self.graph_version += 1
+        remap = []
+        kept = 0
+        for i in range(len(self.nodes)):
+            if i in removed:
+                remap.append(-1)
+            else:
+                remap.append(kept)
+                kept += 1
+        self.edges.compact(remap)
+        self.nodes.compact(remap)
+        self.adjacency.rebuild(len(self.nodes))
+        self.node_grid.rebuild(self.nodes)
+        self.selected_nodes = set()
+        self.reset_results()
+        if self.tour_store:
+            self.tour_store.remap(remap)
+        return remap
+
+    def refresh_results(self):
+        # Re-highlight the last MST / shortest path from the incrementally kept state
+        tree_results = {
+            "mst": (self.mst_state, "Minimum Spanning Tree", "#009900"),
+            "maxst": (self.maxst_state, "Maximum Spanning Tree", "#CC6600"),
+        }
+        if self.shown_result in tree_results:
+            state, title, color = tree_results[self.shown_result]
+            if state is not None:
+                self.cancel_animation()
+                self.highlight_color = color
+                self.show_spanning_tree(title, state.total, state.edges())
+                self.highlighted_edges = self.animation_edges
+                self.highlighted_path = sorted(self.highlighted_edges.nodes())
+                self.animation_edges = []
+                return
+        elif (
+            self.shown_result == "dijkstra"
+            and self.spt_state is not None
+            and self.spt_state.source == self.start_node
+        ):
+            self.cancel_animation()
+            self.highlight_color = "#00AA00"
+            path = self.spt_state.path_to(self.end_node)
+            if path is None:
+                self.show_no_path()
+            else:
+                self.show_shortest_path(path)
+                self.highlighted_path = self.animation_path
+                self.highlighted_edges = PairArray(zip(path, path[1:]))
+                self.animation_path = []
+            return
+        self.clear_highlights()
+
     def on_left_click(self, event):
         x, y = event.x, event.y
         wx, wy = self.screen_to_world(x, y)
@@ -375,12 +1771,12 @@ class GraphApp:
 
         if self.mode == "add_node":
             if clicked is None:
-                self.nodes.append((wx, wy))
+                self.add_node(wx, wy)
                 if len(self.nodes) == 1:
                     self.start_node = 0
                 if len(self.nodes) == 2:
                     self.end_node = 1
-                self.clear_highlights()
+                self.graph_changed()
                 self.redraw()
 
         elif self.mode == "add_edge":
@@ -390,12 +1786,8 @@ class GraphApp:
                     self.status_var.set(f"Node {clicked} selected. Click another node.")
                 else:
                     if self.selected_node != clicked:
-                        exists = any(
-                            (e[0] == self.selected_node and e[1] == clicked)
-                            or (e[0] == clicked and e[1] == self.selected_node)
-                            for e in self.edges
-                        )
-                        if not exists:
+                        current = self.adjacency[self.selected_node].get(clicked)
+                        if current is None:
                             x1, y1 = self.nodes[self.selected_node]
                             x2, y2 = self.nodes[clicked]
                             weight = max(
@@ -410,8 +1802,21 @@ class GraphApp:
                                 maxvalue=999,
                             )
                             if custom:
-                                self.edges.append((self.selected_node, clicked, custom))
-                                self.clear_highlights()
+                                self.add_edge(self.selected_node, clicked, custom)
+                                self.graph_changed()
+                        else:
+                            custom = simpledialog.askinteger(
+                                "Edge Weight",
+                                f"New weight for edge {self.selected_node} → {clicked}:",
+                                initialvalue=current,
+                                minvalue=1,
+                                maxvalue=999,
+                            )
+                            if custom and custom != current:
+                                self.set_edge_weight(
+                                    self.selected_node, clicked, custom
+                                )
+                                self.graph_changed()
 
                     self.selected_node = None
                     self.status_var.set("Click first node, then second to add edge")
@@ -420,30 +1825,226 @@ class GraphApp:
         elif self.mode == "select_start":
             if clicked is not None:
                 self.start_node = clicked
-                self.clear_highlights()
+                self.graph_changed()
                 self.redraw()
 
         elif self.mode == "select_end":
             if clicked is not None:
                 self.end_node = clicked
-                self.clear_highlights()
+                self.graph_changed()
                 self.redraw()
 
+        elif self.mode == "move_node":
+            if clicked is not None:
+                sx, sy = self.world_to_screen(*self.nodes[clicked])
+                self.drag_node = clicked
+                self.drag_offset = (sx - x, sy - y)
+                self.drag_target = None
+                self.canvas.config(cursor="fleur")
+
+        elif self.mode == "select":
+            self.canvas.focus_set()
+            self.band_lasso = bool(event.state & 0x0001)
+            self.band_points = [(x, y)]
+
+        self.update_info()
+
+    def on_drag_move(self, event):
+        if self.band_points:
+            self.extend_selection_band(event.x, event.y)
+            return
+        if self.drag_node is None:
+            return
+        self.render_stats.record_event("drag")
+        dx, dy = self.drag_offset
+        self.drag_target = (event.x + dx, event.y + dy)
+        if self.drag_job is None:
+            self.drag_job = self.root.after(self.drag_interval, self.apply_drag)
+
+    def apply_drag(self):
+        self.drag_job = None
+        if self.drag_node is None or self.drag_target is None:
+            return
+        k = self.drag_node
+        old = self.nodes[k]
+        self.nodes[k] = self.screen_to_world(*self.drag_target)
+        self.node_grid.move(k, old, self.nodes[k])
+        self.move_node_items(k)
+
+    def move_node_items(self, k):
+        x, y = self.world_to_screen(*self.nodes[k])
+        r = self.node_radius * self.zoom_level
+        oval, text = self.node_items[k]
+        self.canvas.coords(oval, x - r, y - r, x + r, y + r)
+        self.canvas.coords(text, x, y)
+        oval_size = max(8, 12 * self.zoom_level)
+        for v in self.adjacency[k]:
+            line, label, weight = self.edge_items[edge_key(k, v)]
+            x2, y2 = self.world_to_screen(*self.nodes[v])
+            mx, my = (x + x2) / 2, (y + y2) / 2
+            self.canvas.coords(line, x, y, x2, y2)
+            self.canvas.coords(
+                label,
+                mx - oval_size,
+                my - oval_size * 0.8,
+                mx + oval_size,
+                my + oval_size * 0.8,
+            )
+            self.canvas.coords(weight, mx, my)
+
+    def on_drag_end(self, event):
+        if self.band_points:
+            self.finish_selection_band(event.x, event.y)
+            return
+        if self.drag_node is None:
+            return
+        if self.drag_job is not None:
+            self.root.after_cancel(self.drag_job)
+            self.drag_job = None
+        self.apply_drag()
+        k = self.drag_node
+        moved = self.drag_target is not None
+        self.drag_node = None
+        self.drag_target = None
+        self.canvas.config(cursor="")
+        if moved and self.drag_reweight_var.get():
+            x1, y1 = self.nodes[k]
+            weights = {}
+            for v, current in self.adjacency[k].items():
+                x2, y2 = self.nodes[v]
+                weight = max(1, int(math.hypot(x2 - x1, y2 - y1) / 10))
+                if weight != current:
+                    weights[edge_key(k, v)] = weight
+            if weights:
+                self.set_edge_weights(weights)
+                self.graph_changed()
+                self.redraw()
+
+    def band_coords(self):
+        if self.band_lasso:
+            return [
+                c for point in self.band_points + self.band_points[:1] for c in point
+            ]
+        (x0, y0), (x1, y1) = self.band_points[0], self.band_points[-1]
+        return [x0, y0, x1, y1]
+
+    def draw_selection_band(self):
+        if len(self.band_points) < 2:
+            return
+        if self.band_lasso:
+            self.band_item = self.canvas.create_line(
+                *self.band_coords(), fill="#00AAFF", dash=(4, 2)
+            )
+        else:
+            self.band_item = self.canvas.create_rectangle(
+                *self.band_coords(), outline="#00AAFF", dash=(4, 2)
+            )
+
+    def extend_selection_band(self, x, y):
+        if self.band_lasso:
+            lx, ly = self.band_points[-1]
+            if abs(x - lx) + abs(y - ly) < 3:
+                return
+            self.band_points.append((x, y))
+        else:
+            self.band_points[1:] = [(x, y)]
+        if self.band_item is None:
+            self.draw_selection_band()
+        else:
+            self.canvas.coords(self.band_item, *self.band_coords())
+
+    def finish_selection_band(self, x, y):
+        x0, y0 = self.band_points[0]
+        points = [self.screen_to_world(px, py) for px, py in self.band_points]
+        self.band_points = []
+        self.band_item = None
+        if len(points) < 2 or (not self.band_lasso and abs(x - x0) + abs(y - y0) < 3):
+            clicked = self.get_node_at(x, y)
+            if clicked is None:
+                self.selected_nodes = set()
+            else:
+                self.selected_nodes ^= {clicked}
+        elif self.band_lasso:
+            self.selected_nodes = {
+                i
+                for i, (wx, wy) in enumerate(self.nodes)
+                if point_in_polygon(wx, wy, points)
+            }
+        else:
+            (ax, ay), (bx, by) = points[0], self.screen_to_world(x, y)
+            left, right = min(ax, bx), max(ax, bx)
+            top, bottom = min(ay, by), max(ay, by)
+            self.selected_nodes = {
+                i
+                for i, (wx, wy) in enumerate(self.nodes)
+                if left <= wx <= right and top <= wy <= bottom
+            }
+        self.status_var.set(f"{len(self.selected_nodes)} node(s) selected")
+        self.redraw()
+
+    def delete_selection(self):
+        if not self.selected_nodes:
+            return
+        count = len(self.selected_nodes)
+        remap = self.delete_nodes(self.selected_nodes)
+        if self.start_node is not None:
+            if remap[self.start_node] >= 0:
+                self.start_node = remap[self.start_node]
+            else:
+                self.start_node = 0 if self.nodes else None
+        if self.end_node is not None:
+            if remap[self.end_node] >= 0:
+                self.end_node = remap[self.end_node]
+            else:
+                self.end_node = len(self.nodes) - 1 if self.nodes else None
+        self.status_var.set(f"Deleted {count} node(s)")
+        self.graph_changed()
+        self.redraw()
         self.update_info()
 
+    def reweight_selection(self):
+        inside = {
+            edge_key(u, v): w
+            for u in self.selected_nodes
+            for v, w in self.adjacency[u].items()
+            if v in self.selected_nodes
+        }
+        if not inside:
+            self.status_var.set("No edges inside the selection")
+            return
+        weight = simpledialog.askinteger(
+            "Edge Weight",
+            f"New weight for {len(inside)} selected edge(s):",
+            initialvalue=next(iter(inside.values())),
+            minvalue=1,
+            maxvalue=999,
+        )
+        if not weight:
+            return
+        changed = {key: weight for key, w in inside.items() if w != weight}
+        if changed:
+            self.set_edge_weights(changed)
+            self.graph_changed()
+        self.redraw()
+
+    def selection_as_start(self):
+        if self.selected_nodes:
+            self.start_node = min(self.selected_nodes)
+            self.graph_changed()
+            self.redraw()
+            self.update_info()
+
+    def selection_as_end(self):
+        if self.selected_nodes:
+            self.end_node = min(self.selected_nodes)
+            self.graph_changed()
+            self.redraw()
+            self.update_info()
+
     def on_right_click(self, event):
         clicked = self.get_node_at(event.x, event.y)
         if clicked is not None:
-            self.edges = [e for e in self.edges if e[0] != clicked and e[1] != clicked]
-            self.edges = [
-                (
-                    e[0] - (1 if e[0] > clicked else 0),
-                    e[1] - (1 if e[1] > clicked else 0),
-                    e[2],
-                )
-                for e in self.edges
-            ]
-            self.nodes.pop(clicked)
+            self.delete_node(clicked)
 
             if self.start_node == clicked:
                 self.start_node = 0 if self.nodes else None
@@ -455,7 +2056,15 @@ class GraphApp:
             elif self.end_node and self.end_node > clicked:
                 self.end_node -= 1
 
-            self.clear_highlights()
+            self.graph_changed()
+            self.redraw()
+            self.update_info()
+            return
+
+        edge = self.get_edge_at(event.x, event.y)
+        if edge is not None:
+            self.remove_edge(*edge)
+            self.graph_changed()
             self.redraw()
             self.update_info()
 
@@ -472,18 +2081,16 @@ class GraphApp:
     def clear_highlights(self):
         self.highlighted_path = []
         self.highlighted_edges = []
+        self.shown_result = None
         self.result_text.delete(1.0, tk.END)
 
-    def redraw(self):
-        self.canvas.delete("all")
-
-        current_anim_edge = None
+    def current_animation_edge(self):
         if (
             self.animation_mode == "path"
             and self.animation_path
             and self.animation_step > 0
         ):
-            current_anim_edge = (
+            return edge_key(
                 self.animation_path[self.animation_step - 1],
                 self.animation_path[self.animation_step],
             )
@@ -492,7 +2099,40 @@ class GraphApp:
             and self.animation_edges
             and self.animation_step > 0
         ):
-            current_anim_edge = self.animation_edges[self.animation_step - 1]
+            return edge_key(*self.animation_edges[self.animation_step - 1])
+        return None
+
+    def highlighted_edge_keys(self):
+        keys = {edge_key(u, v) for u, v in self.highlighted_edges}
+        if self.animation_mode == "path":
+            path = self.highlighted_path
+            keys.update(edge_key(path[i], path[i + 1]) for i in range(len(path) - 1))
+        return keys
+
+    def redraw(self):
+        started = time.perf_counter()
+        self.canvas.delete("all")
+        self.node_items = []
+        self.edge_items = {}
+        self.drawn_view = (self.canvas_offset_x, self.canvas_offset_y, self.zoom_level)
+        self.view_preview = False
+
+        current_anim_edge = self.current_animation_edge()
+        highlighted = self.highlighted_edge_keys()
+        path_nodes = set(self.highlighted_path)
+        selected = set(self.selected_nodes)
+        if self.selected_node is not None:
+            selected.add(self.selected_node)
+
+        current_nodes = ()
+        if (
+            self.animation_mode == "path"
+            and self.animation_path
+            and self.highlighted_path
+        ):
+            current_nodes = (self.highlighted_path[-1],)
+        elif self.animation_mode == "edges" and current_anim_edge:
+            current_nodes = current_anim_edge
 
         scaled_radius = self.node_radius * self.zoom_level
         font_size = max(8, int(12 * self.zoom_level))
@@ -506,86 +2146,53 @@ class GraphApp:
             x1, y1 = self.world_to_screen(wx1, wy1)
             x2, y2 = self.world_to_screen(wx2, wy2)
 
-            in_highlight = (n1, n2) in self.highlighted_edges or (
-                n2,
-                n1,
-            ) in self.highlighted_edges
-
-            in_path = False
-            if self.animation_mode == "path" and len(self.highlighted_path) > 1:
-                for i in range(len(self.highlighted_path) - 1):
-                    if (
-                        self.highlighted_path[i] == n1
-                        and self.highlighted_path[i + 1] == n2
-                    ) or (
-                        self.highlighted_path[i] == n2
-                        and self.highlighted_path[i + 1] == n1
-                    ):
-                        in_path = True
-                        break
-
-            is_current_edge = False
-            if current_anim_edge:
-                if (n1 == current_anim_edge[0] and n2 == current_anim_edge[1]) or (
-                    n1 == current_anim_edge[1] and n2 == current_anim_edge[0]
-                ):
-                    is_current_edge = True
-
-            if is_current_edge:
-                color = "#FF0000"
-                width = max(3, int(6 * self.zoom_level))
-            elif in_highlight or in_path:
-                color = self.highlight_color
-                width = max(2, int(4 * self.zoom_level))
-            else:
-                color = "#888888"
-                width = max(1, int(2 * self.zoom_level))
+            color, width = edge_style(
+                edge_key(n1, n2),
+                highlighted,
+                current_anim_edge,
+                self.highlight_color,
+                self.zoom_level,
+            )
 
-            self.canvas.create_line(x1, y1, x2, y2, fill=color, width=width)
+            line = self.canvas.create_line(
+                x1, y1, x2, y2, fill=color, width=width, tags="graph"
+            )
 
             mx, my = (x1 + x2) / 2, (y1 + y2) / 2
             oval_size = max(8, 12 * self.zoom_level)
-            self.canvas.create_oval(
+            label = self.canvas.create_oval(
                 mx - oval_size,
                 my - oval_size * 0.8,
                 mx + oval_size,
                 my + oval_size * 0.8,
                 fill="white",
                 outline=color,
+                tags="graph",
             )
-            self.canvas.create_text(
+            text = self.canvas.create_text(
                 mx,
                 my,
                 text=str(weight),
                 font=("Arial", weight_font_size, "bold"),
                 fill=color,
+                tags="graph",
             )
+            self.edge_items[edge_key(n1, n2)] = (line, label, text)
 
         for i, (wx, wy) in enumerate(self.nodes):
             x, y = self.world_to_screen(wx, wy)
 
-            is_current_node = False
-            if self.animation_mode == "path" and self.animation_path and len(self.highlighted_path) > 0:
-                is_current_node = i == self.highlighted_path[-1]
-            elif self.animation_mode == "edges" and self.animation_edges and self.animation_step > 0:
-                current_edge = self.animation_edges[self.animation_step - 1]
-                is_current_node = i == current_edge[0] or i == current_edge[1]
-
-            if is_current_node and (self.animation_path or self.animation_edges):
-                color, outline = "#FF5500", "#CC3300"
-            elif i == self.start_node:
-                color, outline = "#00CC00", "#008800"
-            elif i == self.end_node:
-                color, outline = "#CC0000", "#880000"
-            elif i in self.highlighted_path:
-                color, outline = "#FFAA00", "#CC8800"
-            elif i == self.selected_node:
-                color, outline = "#00AAFF", "#0088CC"
-            else:
-                color, outline = "#4488FF", "#2266CC"
+            color, outline = node_style(
+                i,
+                current_nodes,
+                self.start_node,
+                self.end_node,
+                path_nodes,
+                selected,
+            )
 
             r = scaled_radius
-            self.canvas.create_oval(
+            oval = self.canvas.create_oval(
                 x - r,
                 y - r,
                 x + r,
@@ -593,181 +2200,773 @@ class GraphApp:
                 fill=color,
                 outline=outline,
                 width=max(2, int(3 * self.zoom_level)),
+                tags="graph",
             )
-            self.canvas.create_text(
-                x, y, text=str(i), font=("Arial", font_size, "bold"), fill="white"
+            text = self.canvas.create_text(
+                x,
+                y,
+                text=str(i),
+                font=("Arial", font_size, "bold"),
+                fill="white",
+                tags="graph",
             )
+            self.node_items.append((oval, text))
 
-    def run_algorithm(self, mode, extra_input=""):
-        if not os.path.exists(self.exe_path):
-            if not self.compile_cpp():
-                return None
+        if self.band_points:
+            self.draw_selection_band()
 
-        n, m = len(self.nodes), len(self.edges)
-        input_data = f"{mode}\n{n} {m}\n"
-        for e in self.edges:
-            input_data += f"{e[0]} {e[1]} {e[2]}\n"
-        input_data += extra_input
+        # Counted before the HUD's own overlay items are added
+        self.render_stats.record_redraw(started, len(self.canvas.find_all()))
+        if self.show_hud:
+            self.draw_hud()
+
+    def toggle_hud(self):
+        self.show_hud = self.hud_var.get()
+        self.redraw()
+
+    def draw_hud(self):
+        stats = self.render_stats.snapshot()
+        rates = stats["events_per_second"]
+        lines = [
+            f"redraw p50 {stats['redraw_ms']['p50']:.1f} ms  "
+            f"p99 {stats['redraw_ms']['p99']:.1f} ms",
+            f"items {stats['items']}  redraws {stats['redraws']}  "
+            f"previews {stats['previews']}",
+            f"latency p50 {stats['latency_ms']['p50']:.1f} ms  "
+            f"p99 {stats['latency_ms']['p99']:.1f} ms",
+            f"pan {rates.get('pan', 0)}/s  zoom {rates.get('zoom', 0)}/s",
+            f"anim ticks {stats['ticks']}  dropped {stats['dropped_ticks']}",
+        ]
+        self.canvas.create_rectangle(
+            4, 4, 290, 12 + 14 * len(lines), fill="#222222", outline="", tags="hud"
+        )
+        self.canvas.create_text(
+            10,
+            8,
+            anchor=tk.NW,
+            text="\n".join(lines),
+            font=("Consolas", 9),
+            fill="#00FF66",
+            tags="hud",
+        )
 
+    def export_stats(self):
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".json", filetypes=[("JSON", "*.json")]
+        )
+        if not filename:
+            return
+        try:
+            self.render_stats.export(filename)
+        except OSError as e:
+            messagebox.showerror("Export Error", str(e))
+            return
+        self.status_var.set(f"Exported {os.path.basename(filename)}")
+
+    def export_image(self):
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".png",
+            filetypes=[("PNG image", "*.png"), ("SVG image", "*.svg")],
+        )
+        if not filename:
+            return
+        if self.export_worker is not None:
+            self.status_var.set("An export is already running")
+            return
+
+        # The worker draws a snapshot, so edits made meanwhile do not race with it
+        nodes, edges = self.nodes.copy(), self.edges.copy()
+        options = {
+            "start_node": self.start_node,
+            "end_node": self.end_node,
+            "highlighted_path": list(self.highlighted_path),
+            "highlighted_edges": self.highlighted_edge_keys(),
+            "highlight_color": self.highlight_color,
+            "scale": self.export_scale,
+            "node_radius": self.node_radius,
+        }
+        result = {"scale": None, "error": None}
+
+        def export():
+            try:
+                result["scale"] = export_graph(filename, nodes, edges, **options)
+            except Exception as e:
+                result["error"] = e
+
+        self.export_worker = threading.Thread(target=export, daemon=True)
+        self.export_worker.start()
+        self.status_var.set(f"Exporting {os.path.basename(filename)}...")
+        self.root.after(self.stream_poll_interval, self.poll_export, filename, result)
+
+    def poll_export(self, filename, result):
+        if self.export_worker.is_alive():
+            self.root.after(
+                self.stream_poll_interval, self.poll_export, filename, result
+            )
+            return
+        self.export_worker = None
+        if result["error"] is not None:
+            messagebox.showerror("Export Error", str(result["error"]))
+            return
+        name = os.path.basename(filename)
+        if result["scale"] < self.export_scale:
+            self.status_var.set(
+                f"Exported {name} at {result['scale']:.2f}x to fit the size limit"
+            )
+        else:
+            self.status_var.set(f"Exported {name}")
+
+    def backend_input(self, mode, extra_input=""):
+        # Edge columns go to the backend as raw int32 records, no per-edge formatting
+        header = f"{mode}\n{len(self.nodes)} {len(self.edges)} binary\n"
+        return header.encode() + self.edges.to_bytes() + extra_input.encode()
+
+    def run_backend(self, mode, extra_input=""):
+        # Like run_algorithm, but failures raise RuntimeError instead of a dialog
+        if not os.path.exists(self.exe_path) and not self.compile_cpp():
+            raise RuntimeError("The algorithm backend is not available")
+
+        input_data = self.backend_input(mode, extra_input)
         try:
             result = subprocess.run(
                 [self.exe_path],
                 input=input_data,
                 capture_output=True,
-                text=True,
-                timeout=10,
+                timeout=self.backend_timeout,
             )
-            return result.stdout.strip()
-        except Exception as e:
+        except subprocess.TimeoutExpired:
+            raise RuntimeError(f"Backend timed out after {self.backend_timeout}s")
+        except OSError as e:
+            raise RuntimeError(f"Backend failed to start: {e}") from e
+        if result.returncode != 0:
+            raise RuntimeError(f"Backend exited with code {result.returncode}")
+        return result.stdout.decode()
+
+    def run_algorithm(self, mode, extra_input=""):
+        if not os.path.exists(self.exe_path):
+            if not self.compile_cpp():
+                return None
+
+        try:
+            return self.run_backend(mode, extra_input).strip()
+        except RuntimeError as e:
             messagebox.showerror("Error", str(e))
             return None
 
-    def find_shortest_path(self):
+    def start_backend_run(
+        self, mode, extra_input, on_done, parser=None, on_progress=None, on_status=None
+    ):
+        self.cancel_backend_run()
+        if not os.path.exists(self.exe_path):
+            if not self.compile_cpp():
+                return
+
+        input_data = self.backend_input(mode, extra_input)
+        generation = self.backend_generation
+        try:
+            process = subprocess.Popen(
+                [self.exe_path],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE if on_status else subprocess.DEVNULL,
+            )
+        except Exception as e:
+            self.status_var.set(f"Backend failed to start: {e}")
+            return
+        self.backend_process = process
+
+        chunks = []
+        feed = parser.feed if parser is not None else chunks.append
+        failure = {"error": None}
+
+        def stream():
+            try:
+                process.stdin.write(input_data)
+                process.stdin.close()
+                while True:
+                    chunk = process.stdout.read1(65536)
+                    if not chunk:
+                        break
+                    feed(chunk)
+            except (OSError, ValueError) as e:
+                failure["error"] = e
+            finally:
+                # Reap the process so its exit code is known even if the pipe broke
+                process.wait()
+
+        status = {"line": None, "shown": None}
+
+        def read_status():
+            # The backend reports progress on stderr; only the latest line matters
+            for line in process.stderr:
+                status["line"] = line.decode().strip()
+
+        worker = threading.Thread(target=stream, daemon=True)
+        worker.start()
+        status_worker = None
+        if on_status is not None:
+            status_worker = threading.Thread(target=read_status, daemon=True)
+            status_worker.start()
+        run = {
+            "generation": generation,
+            "worker": worker,
+            "started": time.monotonic(),
+            "shown": 0,
+            "last_progress": 0.0,
+            "parser": parser,
+            "chunks": chunks,
+            "failure": failure,
+            "on_done": on_done,
+            "on_progress": on_progress,
+            "status": status,
+            "status_worker": status_worker,
+            "on_status": on_status,
+        }
+        self.root.after(20, self.poll_backend_run, run)
+
+    def run_algorithm_async(self, mode, extra_input, on_output):
+        self.start_backend_run(mode, extra_input, on_output)
+
+    def stream_algorithm(self, mode, extra_input, on_progress, on_done, on_status=None):
+        self.start_backend_run(
+            mode, extra_input, on_done, IntStreamParser(), on_progress, on_status
+        )
+
+    def report_status(self, run):
+        status = run["status"]
+        if run["on_status"] is not None and status["line"] != status["shown"]:
+            status["shown"] = status["line"]
+            run["on_status"](status["line"])
+
+    def poll_backend_run(self, run):
+        if run["generation"] != self.backend_generation:
+            return
+        parser = run["parser"]
+
+        if run["worker"].is_alive():
+            if time.monotonic() - run["started"] > self.backend_timeout:
+                self.cancel_backend_run()
+                self.status_var.set(
+                    f"Algorithm timed out after {self.backend_timeout}s"
+                )
+                return
+            now = time.monotonic()
+            if (
+                run["on_progress"] is not None
+                and len(parser.values) > run["shown"]
+                and now - run["last_progress"] >= self.stream_redraw_interval
+            ):
+                run["shown"] = len(parser.values)
+                run["last_progress"] = now
+                run["on_progress"](parser)
+            self.report_status(run)
+            self.root.after(self.stream_poll_interval, self.poll_backend_run, run)
+            return
+
+        if run["status_worker"] is not None:
+            run["status_worker"].join(1.0)
+            self.report_status(run)
+
+        returncode = self.backend_process.returncode
+        self.backend_process = None
+        if returncode != 0:
+            self.status_var.set(f"Backend exited with code {returncode}")
+            return
+        if run["failure"]["error"] is not None:
+            self.status_var.set(f"Backend I/O failed: {run['failure']['error']}")
+            return
+        if parser is not None:
+            parser.close()
+            run["on_done"](parser)
+        else:
+            run["on_done"](b"".join(run["chunks"]).decode().strip())
+
+    def cancel_backend_run(self):
+        # Bumping the generation makes any pending poll drop its result
+        self.backend_generation += 1
+        if self.backend_process is not None and self.backend_process.poll() is None:
+            self.backend_process.kill()
+        self.backend_process = None
+
+    def request_algorithm(self, mode, extra_input, on_output, auto=False):
+        if auto:
+            self.run_algorithm_async(mode, extra_input, on_output)
+        else:
+            self.cancel_backend_run()
+            on_output(self.run_algorithm(mode, extra_input))
+
+    def get_analysis(self):
+        if self.analysis is None or self.analysis[0] != self.graph_version:
+            self.analysis = (self.graph_version, GraphAnalysis(self.adjacency))
+        return self.analysis[1]
+
+    def check_feasible(self, mode, title, auto=False):
+        seconds, memory = self.get_analysis().estimate(mode)
+        if memory == INF:
+            self.warn(f"{title} is too large to run on this graph.", auto)
+            return False
+        if memory > self.max_backend_memory:
+            self.warn(
+                f"{title} would need about {memory / 1024**3:.1f} GB of memory.", auto
+            )
+            return False
+        if seconds > self.backend_timeout:
+            self.warn(
+                f"{title} would take about {seconds:.0f}s, "
+                f"over the {self.backend_timeout}s limit.",
+                auto,
+            )
+            return False
+        return True
+
+    def warn(self, message, auto=False):
+        if auto:
+            self.status_var.set(f"Auto-run skipped: {message}")
+        else:
+            messagebox.showwarning("Warning", message)
+
+    def toggle_auto_run(self):
+        self.auto_run = self.auto_run_var.get()
+        if self.auto_run:
+            self.schedule_auto_run()
+        else:
+            if self.auto_run_job:
+                self.root.after_cancel(self.auto_run_job)
+                self.auto_run_job = None
+            self.cancel_backend_run()
+
+    def schedule_auto_run(self):
+        if not self.auto_run or self.last_algorithm is None:
+            return
+        self.cancel_backend_run()
+        if self.auto_run_job:
+            self.root.after_cancel(self.auto_run_job)
+        self.auto_run_job = self.root.after(self.auto_run_delay, self.auto_run_tick)
+
+    def auto_run_tick(self):
+        self.auto_run_job = None
+        self.algorithm_commands[self.last_algorithm](auto=True)
+
+    def graph_changed(self):
+        self.cancel_backend_run()
+        self.refresh_results()
+        self.schedule_auto_run()
+
+    def present_result(self, auto):
+        self.start_animation()
+        if auto:
+            self.animation_step = self.get_animation_total_steps()
+            self.update_animation_display()
+
+    def find_shortest_path(self, auto=False):
+        if not auto:
+            self.last_algorithm = "dijkstra"
         if len(self.nodes) < 2:
-            messagebox.showwarning("Warning", "Add at least 2 nodes!")
+            self.warn("Add at least 2 nodes!", auto)
             return
         if self.start_node is None or self.end_node is None:
-            messagebox.showwarning("Warning", "Set start and end nodes!")
+            self.warn("Set start and end nodes!", auto)
+            return
+
+        analysis = self.get_analysis()
+        if not analysis.connected(self.start_node, self.end_node):
+            self.cancel_animation()
+            self.highlighted_path = []
+            self.highlighted_edges = []
+            self.shown_result = None
+            self.show_no_path()
+            self.redraw()
+            return
+        if not self.check_feasible("spt", "Dijkstra", auto):
             return
 
+        if self.spt_state is None or self.spt_state.source != self.start_node:
+            start = self.start_node
+            self.request_algorithm(
+                "spt",
+                f"{start}\n",
+                lambda output: self.on_shortest_path_tree(output, start, auto),
+                auto,
+            )
+        else:
+            self.show_shortest_path_result(auto)
+
+    def on_shortest_path_tree(self, output, start, auto):
+        if not output:
+            return
+        lines = output.split("\n")
+        dist = [INF if d < 0 else d for d in map(int, lines[0].split())]
+        parent = list(map(int, lines[1].split()))
+        self.spt_state = ShortestPathTreeState(start, dist, parent)
+        self.show_shortest_path_result(auto)
+
+    def shortest_path_batch(self, pairs, with_paths=False):
+        pairs = list(pairs)
+        extra_input = f"{len(pairs)} {int(with_paths)}\n" + "".join(
+            f"{s} {t}\n" for s, t in pairs
+        )
+        lines = self.run_backend("dijkstra-batch", extra_input).splitlines()
+        if len(lines) != len(pairs):
+            raise RuntimeError(
+                f"Backend returned {len(lines)} results for {len(pairs)} queries"
+            )
+
+        results = []
+        for line in lines:
+            values = list(map(int, line.split()))
+            if not values:
+                raise RuntimeError("Backend returned an empty batch result line")
+            dist = None if values[0] < 0 else values[0]
+            if with_paths:
+                results.append((dist, values[1:] or None))
+            else:
+                results.append(dist)
+        return results
+
+    def all_pairs_shortest_paths(self, filename=None, strategy="auto"):
+        if self.apsp is not None:
+            version, matrix = self.apsp
+            if (
+                version == self.graph_version
+                and filename in (None, matrix.filename)
+                and not matrix.closed
+            ):
+                return matrix
+            # Matrices already handed out stay valid until their holders drop them
+            self.apsp = None
+
+        temporary = filename is None
+        if temporary:
+            fd, filename = tempfile.mkstemp(prefix="graph_apsp_", suffix=".bin")
+            os.close(fd)
+        try:
+            output = self.run_backend("apsp", f"{filename}\n{strategy}\n")
+        except RuntimeError:
+            if temporary:
+                DistanceMatrix.remove(filename)
+            raise
+
+        n, used = output.split()
+        matrix = DistanceMatrix(filename, int(n), used, temporary)
+        self.apsp = (self.graph_version, matrix)
+        return matrix
+
+    def show_shortest_path_result(self, auto=False):
         self.cancel_animation()
         self.highlight_color = "#00AA00"
-        output = self.run_algorithm("dijkstra", f"{self.start_node} {self.end_node}\n")
         self.highlighted_path = []
         self.highlighted_edges = []
 
-        if output == "NO_PATH":
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, "No path found!")
+        self.shown_result = "dijkstra"
+        path = self.spt_state.path_to(self.end_node)
+        if path is None:
+            self.show_no_path()
             self.redraw()
         else:
-            self.animation_path = list(map(int, output.split()))
-
-            total = 0
-            path_details = []
-            for i in range(len(self.animation_path) - 1):
-                n1, n2 = self.animation_path[i], self.animation_path[i + 1]
-                weight = self.get_edge_weight(n1, n2)
-                total += weight
-                path_details.append(f"{n1} → {n2} (weight: {weight})")
-
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, f"Dijkstra Shortest Path\n\n")
-            self.result_text.insert(tk.END, f"Total Distance: {total}\n\n")
-            self.result_text.insert(
-                tk.END, f"Path ({len(self.animation_path)} nodes):\n"
-            )
-            for detail in path_details:
-                self.result_text.insert(tk.END, f"  {detail}\n")
-
+            self.show_shortest_path(path)
             if len(self.animation_path) > 1:
                 self.animation_mode = "path"
                 self.animation_title = "Dijkstra"
-                self.start_animation()
+                self.present_result(auto)
+            else:
+                self.redraw()
 
-    def find_mst(self):
+    def show_no_path(self):
+        self.animation_path = []
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, "No path found!")
+
+    def show_shortest_path(self, path):
+        self.animation_path = list(path)
+
+        total = 0
+        path_details = []
+        for i in range(len(self.animation_path) - 1):
+            n1, n2 = self.animation_path[i], self.animation_path[i + 1]
+            weight = self.get_edge_weight(n1, n2)
+            total += weight
+            path_details.append(f"{n1} → {n2} (weight: {weight})")
+
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, f"Dijkstra Shortest Path\n\n")
+        self.result_text.insert(tk.END, f"Total Distance: {total}\n\n")
+        self.result_text.insert(
+            tk.END, f"Path ({len(self.animation_path)} nodes):\n"
+        )
+        for detail in path_details:
+            self.result_text.insert(tk.END, f"  {detail}\n")
+
+    def k_shortest_paths(self, auto=False):
+        if not auto:
+            self.last_algorithm = "ksp"
         if len(self.nodes) < 2:
-            messagebox.showwarning("Warning", "Add at least 2 nodes!")
+            self.warn("Add at least 2 nodes!", auto)
+            return
+        if self.start_node is None or self.end_node is None:
+            self.warn("Set start and end nodes!", auto)
+            return
+        if not auto:
+            k = simpledialog.askinteger(
+                "K Shortest Paths",
+                "Number of paths:",
+                initialvalue=self.k_paths,
+                minvalue=1,
+                maxvalue=100,
+            )
+            if not k:
+                return
+            self.k_paths = k
+
+        if not self.get_analysis().connected(self.start_node, self.end_node):
+            self.on_k_shortest_paths("NO_PATH", auto)
             return
+        if not self.check_feasible("spt", "K Shortest Paths", auto):
+            return
+
+        self.request_algorithm(
+            "ksp",
+            f"{self.start_node} {self.end_node} {self.k_paths}\n",
+            lambda output: self.on_k_shortest_paths(output, auto),
+            auto,
+        )
 
+    def on_k_shortest_paths(self, output, auto=False):
+        if not output:
+            return
+        self.path_alternatives = []
+        for line in output.split("\n"):
+            values = line.split()
+            if values and values[0] != "NO_PATH":
+                values = list(map(int, values))
+                self.path_alternatives.append((values[0], values[1:]))
+
+        if not self.path_alternatives:
+            self.cancel_animation()
+            self.highlighted_path = []
+            self.highlighted_edges = []
+            self.shown_result = None
+            self.show_no_path()
+            self.redraw()
+            return
+        self.show_path_alternative(0, auto)
+
+    def show_path_alternative(self, index, auto=False):
         self.cancel_animation()
-        self.highlight_color = "#009900"
+        self.highlight_color = "#00AA00"
         self.highlighted_path = []
         self.highlighted_edges = []
+        self.shown_result = "ksp"
+        self.alternative_index = index
+        cost, path = self.path_alternatives[index]
+        self.animation_path = list(path)
+
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(
+            tk.END, f"K Shortest Paths ({len(self.path_alternatives)} found)\n\n"
+        )
+        for i, (c, p) in enumerate(self.path_alternatives):
+            marker = "▶" if i == index else " "
+            self.result_text.insert(
+                tk.END, f"{marker} #{i + 1}: cost {c} ({len(p)} nodes)\n"
+            )
+        self.result_text.insert(tk.END, f"\nPath #{index + 1} (cost {cost}):\n")
+        self.show_tour_details(self.animation_path)
+
+        self.alternative_var.set(f"Path {index + 1} / {len(self.path_alternatives)}")
+        if len(self.animation_path) > 1:
+            self.animation_mode = "path"
+            self.animation_title = f"Path #{index + 1}"
+            self.present_result(auto)
+            self.alternative_row.pack(pady=2)
+        else:
+            self.redraw()
 
-        output = self.run_algorithm("mst")
+    def alternative_prev(self):
+        if self.alternative_index > 0:
+            self.show_path_alternative(self.alternative_index - 1)
 
-        if output:
-            lines = output.strip().split("\n")
-            weight = int(lines[0])
+    def alternative_next(self):
+        if self.alternative_index < len(self.path_alternatives) - 1:
+            self.show_path_alternative(self.alternative_index + 1)
 
-            self.animation_edges = []
-            for line in lines[1:]:
-                parts = line.split()
-                if len(parts) == 2:
-                    self.animation_edges.append((int(parts[0]), int(parts[1])))
+    def show_spanning_tree(self, title, weight, edges):
+        self.animation_edges = PairArray(edges)
 
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, f"Minimum Spanning Tree\n\n")
-            self.result_text.insert(tk.END, f"Total Weight: {weight}\n\n")
-            self.result_text.insert(tk.END, f"Edges ({len(self.animation_edges)}):\n")
-            for e in self.animation_edges:
-                w = self.get_edge_weight(e[0], e[1])
-                self.result_text.insert(tk.END, f"  {e[0]} — {e[1]} (weight: {w})\n")
-
-            if len(self.animation_edges) > 0:
-                self.animation_mode = "edges"
-                self.animation_title = "MST"
-                self.start_animation()
-            else:
-                self.redraw()
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, f"{title}\n\n")
+        self.result_text.insert(tk.END, f"Total Weight: {weight}\n\n")
+        self.result_text.insert(tk.END, f"Edges ({len(self.animation_edges)}):\n")
+        limit = self.result_step_limit
+        for u, v in self.animation_edges[:limit]:
+            w = self.get_edge_weight(u, v)
+            self.result_text.insert(tk.END, f"  {u} — {v} (weight: {w})\n")
+        if len(self.animation_edges) > limit:
+            self.result_text.insert(
+                tk.END, f"  ... {len(self.animation_edges) - limit} more\n"
+            )
 
-    def find_max_st(self):
+    def parse_spanning_tree(self, output, maximize):
+        lines = output.strip().split("\n")
+        state = SpanningTreeState(len(self.nodes), maximize)
+        for line in lines[1:]:
+            parts = line.split()
+            if len(parts) == 2:
+                u, v = int(parts[0]), int(parts[1])
+                state.link(u, v, self.get_edge_weight(u, v))
+        return state
+
+    def change_spanning_tree_solver(self, event=None):
+        self.spanning_tree_solver = self.spanning_tree_solver_var.get()
+        # Cached trees came from the previous solver; the next run uses the new one
+        self.mst_state = None
+        self.maxst_state = None
+        self.status_var.set(f"Spanning tree solver: {self.spanning_tree_solver}")
+
+    def find_mst(self, auto=False):
+        if not auto:
+            self.last_algorithm = "mst"
         if len(self.nodes) < 2:
-            messagebox.showwarning("Warning", "Add at least 2 nodes!")
+            self.warn("Add at least 2 nodes!", auto)
             return
 
+        if self.mst_state is None:
+            if not self.check_feasible("mst", "Minimum Spanning Tree", auto):
+                return
+            self.request_algorithm(
+                "mst",
+                f"{self.spanning_tree_solver}\n",
+                lambda output: self.on_mst(output, auto),
+                auto,
+            )
+        else:
+            self.show_mst_result(auto)
+
+    def on_mst(self, output, auto):
+        if output:
+            self.mst_state = self.parse_spanning_tree(output, False)
+            self.show_mst_result(auto)
+
+    def show_mst_result(self, auto=False):
         self.cancel_animation()
-        self.highlight_color = "#CC6600"
+        self.highlight_color = "#009900"
         self.highlighted_path = []
         self.highlighted_edges = []
 
-        output = self.run_algorithm("maxst")
+        self.shown_result = "mst"
+        self.show_spanning_tree(
+            "Minimum Spanning Tree", self.mst_state.total, self.mst_state.edges()
+        )
+
+        if len(self.animation_edges) > 0:
+            self.animation_mode = "edges"
+            self.animation_title = "MST"
+            self.present_result(auto)
+        else:
+            self.redraw()
+
+    def find_max_st(self, auto=False):
+        if not auto:
+            self.last_algorithm = "maxst"
+        if len(self.nodes) < 2:
+            self.warn("Add at least 2 nodes!", auto)
+            return
+
+        if self.maxst_state is None:
+            if not self.check_feasible("mst", "Maximum Spanning Tree", auto):
+                return
+            self.request_algorithm(
+                "maxst",
+                f"{self.spanning_tree_solver}\n",
+                lambda output: self.on_max_st(output, auto),
+                auto,
+            )
+        else:
+            self.show_max_st_result(auto)
 
+    def on_max_st(self, output, auto):
         if output:
-            lines = output.strip().split("\n")
-            weight = int(lines[0])
+            self.maxst_state = self.parse_spanning_tree(output, True)
+            self.show_max_st_result(auto)
 
-            self.animation_edges = []
-            for line in lines[1:]:
-                parts = line.split()
-                if len(parts) == 2:
-                    self.animation_edges.append((int(parts[0]), int(parts[1])))
+    def show_max_st_result(self, auto=False):
+        self.cancel_animation()
+        self.highlight_color = "#CC6600"
+        self.highlighted_path = []
+        self.highlighted_edges = []
 
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, f"Maximum Spanning Tree\n\n")
-            self.result_text.insert(tk.END, f"Total Weight: {weight}\n\n")
-            self.result_text.insert(tk.END, f"Edges ({len(self.animation_edges)}):\n")
-            for e in self.animation_edges:
-                w = self.get_edge_weight(e[0], e[1])
-                self.result_text.insert(tk.END, f"  {e[0]} — {e[1]} (weight: {w})\n")
-
-            if len(self.animation_edges) > 0:
-                self.animation_mode = "edges"
-                self.animation_title = "Max ST"
-                self.start_animation()
-            else:
-                self.redraw()
+        self.shown_result = "maxst"
+        self.show_spanning_tree(
+            "Maximum Spanning Tree", self.maxst_state.total, self.maxst_state.edges()
+        )
 
-    def chinese_postman(self):
+        if len(self.animation_edges) > 0:
+            self.animation_mode = "edges"
+            self.animation_title = "Max ST"
+            self.present_result(auto)
+        else:
+            self.redraw()
+
+    def chinese_postman(self, auto=False):
+        if not auto:
+            self.last_algorithm = "chinese"
         if len(self.edges) == 0:
-            messagebox.showwarning("Warning", "Add some edges first!")
+            self.warn("Add some edges first!", auto)
             return
 
-        self.cancel_animation()
+        analysis = self.get_analysis()
+        if analysis.edge_components > 1:
+            self.warn(
+                f"Edges form {analysis.edge_components} separate components; "
+                "no single tour can cover them all.",
+                auto,
+            )
+            return
+        if not self.check_feasible("chinese", "Chinese Postman", auto):
+            return
 
+        self.cancel_animation()
         self.highlight_color = "#AA00AA"
-        self.highlighted_path = []
+        self.shown_result = None
+        self.stream_algorithm(
+            "chinese",
+            "",
+            lambda parser: self.show_partial_tour(parser, "Chinese Postman"),
+            lambda parser: self.on_chinese_postman(parser, auto),
+        )
+
+    def show_partial_tour(self, parser, title):
+        # Highlight the part of the tour received so far while the rest streams in
+        tour = parser.values[1:]
+        self.animation_mode = "path"
+        self.highlighted_path = tour
         self.highlighted_edges = []
+        self.status_var.set(f"{title}: received {len(tour)} steps...")
+        self.redraw()
 
-        output = self.run_algorithm("chinese")
+    def show_tour_details(self, tour):
+        limit = self.result_step_limit
+        for i in range(min(len(tour) - 1, limit)):
+            u, v = tour[i], tour[i + 1]
+            weight = self.get_edge_weight(u, v)
+            self.result_text.insert(tk.END, f"  {u} → {v} (weight: {weight})\n")
+        if len(tour) - 1 > limit:
+            self.result_text.insert(tk.END, f"  ... {len(tour) - 1 - limit} more\n")
 
-        if output:
-            lines = output.strip().split("\n")
-            cost = int(lines[0])
+    def on_chinese_postman(self, parser, auto=False):
+        self.cancel_animation()
 
-            if len(lines) > 1 and lines[1].strip():
-                self.animation_path = list(map(int, lines[1].split()))
-            else:
-                self.animation_path = []
+        self.highlight_color = "#AA00AA"
+        self.highlighted_path = []
+        self.highlighted_edges = []
+        # Tours are not kept incrementally, so edits clear them instead
+        self.shown_result = None
+
+        if parser.values:
+            cost = parser.values[0]
+            self.animation_path = parser.values[1:]
 
             base_cost = sum(e[2] for e in self.edges)
             extra_cost = cost - base_cost
-            path_details = []
-            for i in range(len(self.animation_path) - 1):
-                u, v = self.animation_path[i], self.animation_path[i + 1]
-                weight = self.get_edge_weight(u, v)
-                path_details.append(f"{u} → {v} (weight: {weight})")
 
             self.result_text.delete(1.0, tk.END)
             self.result_text.insert(tk.END, f"Chinese Postman Problem\n\n")
@@ -777,25 +2976,25 @@ class GraphApp:
             self.result_text.insert(
                 tk.END, f"Tour ({len(self.animation_path)} nodes):\n"
             )
-            for detail in path_details:
-                self.result_text.insert(tk.END, f"  {detail}\n")
+            self.show_tour_details(self.animation_path)
+            self.status_var.set("Chinese Postman tour complete")
 
             if len(self.animation_path) > 1:
-                self.start_animation()
+                self.animation_mode = "path"
+                self.animation_title = "Postman"
+                self.present_result(auto)
             else:
                 self.redraw()
 
     def get_edge_weight(self, u, v):
-        for e in self.edges:
-            if (e[0] == u and e[1] == v) or (e[0] == v and e[1] == u):
-                return e[2]
-        return 0
+        return self.adjacency[u].get(v, 0)
 
     def start_animation(self):
         self.animation_step = 0
         self.animation_playing = False
         self.animation_frame.pack_forget()
         self.animation_frame.pack(fill=tk.X, pady=5)
+        self.alternative_row.pack_forget()
         self.play_btn.config(text="▶ Play")
         self.update_animation_display()
 
@@ -838,12 +3037,18 @@ class GraphApp:
         else:
             self.animation_playing = True
             self.play_btn.config(text="⏸ Pause")
+            self.animation_due = 0.0
             self.animation_tick()
 
     def animation_tick(self):
         if not self.animation_playing:
             return
 
+        if self.animation_due:
+            self.render_stats.record_tick(
+                time.perf_counter() - self.animation_due, self.animation_speed / 1000
+            )
+        self.animation_due = time.perf_counter() + self.animation_speed / 1000
         total_steps = self.get_animation_total_steps()
         if self.animation_step < total_steps:
             self.animation_step += 1
@@ -881,12 +3086,9 @@ class GraphApp:
                 return
 
             self.step_var.set(f"Step: {self.animation_step} / {total_steps}")
+            # Path edges are derived from highlighted_path in highlighted_edge_keys
             self.highlighted_path = self.animation_path[: self.animation_step + 1]
-
             self.highlighted_edges = []
-            for i in range(self.animation_step):
-                n1, n2 = self.animation_path[i], self.animation_path[i + 1]
-                self.highlighted_edges.append((n1, n2))
 
             if self.animation_step > 0:
                 u = self.animation_path[self.animation_step - 1]
@@ -904,12 +3106,7 @@ class GraphApp:
 
             self.step_var.set(f"Edge: {self.animation_step} / {total_steps}")
             self.highlighted_edges = self.animation_edges[: self.animation_step]
-            self.highlighted_path = []
-            for e in self.highlighted_edges:
-                if e[0] not in self.highlighted_path:
-                    self.highlighted_path.append(e[0])
-                if e[1] not in self.highlighted_path:
-                    self.highlighted_path.append(e[1])
+            self.highlighted_path = self.highlighted_edges.nodes()
 
             if self.animation_step > 0:
                 u, v = self.animation_edges[self.animation_step - 1]
@@ -922,63 +3119,134 @@ class GraphApp:
 
         self.redraw()
 
-    def traveling_salesman(self):
+    def traveling_salesman(self, auto=False):
+        if not auto:
+            self.last_algorithm = "tsp"
         if len(self.nodes) < 2:
-            messagebox.showwarning("Warning", "Add at least 2 nodes!")
+            self.warn("Add at least 2 nodes!", auto)
             return
 
-        if len(self.nodes) > 15:
+        start = self.start_node if self.start_node is not None else 0
+        if self.tour_store and self.tour_store.version == self.graph_version:
+            # The optimal cycle does not depend on where it starts
+            self.cancel_animation()
+            self.highlight_color = "#0066CC"
+            self.shown_result = None
+            self.show_tour(start, auto)
+            return
+
+        analysis = self.get_analysis()
+        if analysis.components > 1:
+            self.cancel_animation()
+            self.show_no_tour()
+            return
+        if not self.check_feasible("tsp", "Traveling Salesman", auto):
+            return
+
+        seconds, _ = analysis.estimate("tsp")
+        if seconds > 2 and not auto:
             if not messagebox.askyesno(
                 "Warning",
-                f"TSP with {len(self.nodes)} nodes may take a while.\nContinue?",
+                f"TSP with {len(self.nodes)} nodes ({analysis.tsp_solver}) "
+                f"may take about {seconds:.0f}s.\nContinue?",
             ):
                 return
-
         self.cancel_animation()
-        start = self.start_node if self.start_node is not None else 0
         self.highlight_color = "#0066CC"
+        self.shown_result = None
+        self.tsp_bound = None
+        time_limit = self.backend_timeout * 0.8
+        warm = self.tour_store.cycle if self.tour_store else []
+        self.stream_algorithm(
+            "tsp",
+            f"{start} {self.tsp_solver} {time_limit:g} {len(warm)} "
+            + " ".join(map(str, warm))
+            + "\n",
+            lambda parser: self.show_partial_tour(parser, "Traveling Salesman"),
+            lambda parser: self.on_traveling_salesman(parser, start, auto),
+            self.on_tsp_bound,
+        )
+
+    def on_tsp_bound(self, line):
+        parts = line.split()
+        if len(parts) != 4 or parts[0] != "BOUND":
+            return
+        solver, lower, upper = parts[1], int(parts[2]), int(parts[3])
+        self.tsp_bound = (solver, lower, upper)
+        gap = (upper - lower) / upper if upper else 0.0
+        self.status_var.set(
+            f"TSP ({solver}): best {upper}, lower bound {lower}, gap {gap:.1%}"
+        )
+
+    def show_no_tour(self):
+        self.shown_result = None
         self.highlighted_path = []
         self.highlighted_edges = []
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(
+            tk.END, "No valid tour found!\nGraph may be disconnected."
+        )
+        self.redraw()
 
-        output = self.run_algorithm("tsp", f"{start}\n")
-
-        if output == "NO_PATH":
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(
-                tk.END, "No valid tour found!\nGraph may be disconnected."
+    def on_traveling_salesman(self, parser, start, auto=False):
+        self.cancel_animation()
+        self.highlight_color = "#0066CC"
+        self.highlighted_path = []
+        self.highlighted_edges = []
+        self.shown_result = None
+
+        if parser.text == "NO_PATH":
+            self.tour_store = None
+            self.show_no_tour()
+        elif parser.values:
+            cost = parser.values[0]
+            solver, lower, _ = self.tsp_bound or ("", cost, cost)
+            self.tour_store = TourStore(
+                self.graph_version, parser.values[1:], cost, lower, solver
             )
-            self.redraw()
-        elif output:
-            lines = output.strip().split("\n")
-            cost = int(lines[0])
-
-            if len(lines) > 1:
-                self.animation_path = list(map(int, lines[1].split()))
+            self.show_tour(start, auto)
 
-                path_details = []
-                for i in range(len(self.animation_path) - 1):
-                    n1, n2 = self.animation_path[i], self.animation_path[i + 1]
-                    weight = self.get_edge_weight(n1, n2)
-                    path_details.append(f"{n1} → {n2} (weight: {weight})")
+    def show_tour(self, start, auto=False):
+        store = self.tour_store
+        cost, lower = store.cost, store.lower
+        self.animation_path = store.rotated(start)
 
-            self.result_text.delete(1.0, tk.END)
-            self.result_text.insert(tk.END, f"Traveling Salesman\n\n")
-            self.result_text.insert(tk.END, f"Starting from node: {start}\n")
-            self.result_text.insert(tk.END, f"Minimum Tour Cost: {cost}\n\n")
+        self.result_text.delete(1.0, tk.END)
+        self.result_text.insert(tk.END, f"Traveling Salesman\n\n")
+        self.result_text.insert(tk.END, f"Starting from node: {start}\n")
+        if lower >= cost:
+            self.result_text.insert(tk.END, f"Minimum Tour Cost: {cost}\n")
+        else:
+            self.result_text.insert(tk.END, f"Best Tour Cost: {cost}\n")
+            self.result_text.insert(tk.END, f"Lower Bound: {lower}\n")
             self.result_text.insert(
-                tk.END, f"Tour ({len(self.animation_path)} nodes):\n"
+                tk.END, f"Optimality Gap: {(cost - lower) / cost:.1%}\n"
             )
-            for detail in path_details:
-                self.result_text.insert(tk.END, f"  {detail}\n")
-
-            if len(self.animation_path) > 1:
-                self.animation_mode = "path"
-                self.animation_title = "TSP"
-                self.start_animation()
+        if store.solver:
+            self.result_text.insert(tk.END, f"Solver: {store.solver}\n")
+        self.result_text.insert(tk.END, "\n")
+        self.result_text.insert(tk.END, f"Tour ({len(self.animation_path)} nodes):\n")
+        self.show_tour_details(self.animation_path)
+        if lower >= cost:
+            self.status_var.set("Traveling Salesman tour complete")
+
+        if len(self.animation_path) > 1:
+            self.animation_mode = "path"
+            self.animation_title = "TSP"
+            self.present_result(auto)
+        else:
+            self.redraw()
 
     def clear_graph(self):
-        self.nodes = []
-        self.edges = []
+        self.nodes = NodeStore()
+        self.edges = EdgeStore()
+        self.adjacency = Adjacency(self.edges)
+        self.node_grid.rebuild(self.nodes)
+        self.selected_nodes = set()
+        self.graph_version += 1
+        self.reset_results()
+        self.tour_store = None
+        self.cancel_backend_run()
         self.start_node = None
         self.end_node = None
         self.selected_node = None
@@ -989,30 +3257,35 @@ class GraphApp:
     def load_example(self):
         self.clear_graph()
 
-        self.nodes = [
-            (150, 150),
-            (300, 80),
-            (300, 220),
-            (450, 80),
-            (450, 220),
-            (600, 150),
-            (375, 350),
-        ]
+        self.nodes = NodeStore(
+            [
+                (150, 150),
+                (300, 80),
+                (300, 220),
+                (450, 80),
+                (450, 220),
+                (600, 150),
+                (375, 350),
+            ]
+        )
 
-        self.edges = [
-            (0, 1, 4),
-            (0, 2, 2),
-            (1, 2, 1),
-            (1, 3, 5),
-            (2, 3, 8),
-            (2, 4, 10),
-            (2, 6, 6),
-            (3, 4, 2),
-            (3, 5, 6),
-            (4, 5, 3),
-            (4, 6, 4),
-            (5, 6, 7),
-        ]
+        self.edges = EdgeStore(
+            [
+                (0, 1, 4),
+                (0, 2, 2),
+                (1, 2, 1),
+                (1, 3, 5),
+                (2, 3, 8),
+                (2, 4, 10),
+                (2, 6, 6),
+                (3, 4, 2),
+                (3, 5, 6),
+                (4, 5, 3),
+                (4, 6, 4),
+                (5, 6, 7),
+            ]
+        )
+        self.rebuild_adjacency()
 
         self.start_node = 0
         self.end_node = 5
@@ -1020,6 +3293,7 @@ class GraphApp:
         self.redraw()
         self.update_info()
         self.status_var.set("Example loaded! Try the algorithms.")
+        self.schedule_auto_run()
 
 
 def main():